@@ -15,6 +15,7 @@ import os
 from sqlalchemy.exc import OperationalError
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from .database import Base, engine, SessionLocal
@@ -43,7 +44,7 @@ from .routers import (
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="ia-crm", version="0.1.0")
+    app = FastAPI(title="ia-crm", version="0.1.0", default_response_class=ORJSONResponse)
 
     logging.basicConfig(
         level=logging.INFO,
@@ -8,12 +8,44 @@ un attribut ``tenant_id`` qui permet d’isoler logiquement les données.
 from __future__ import annotations
 
 import datetime as dt
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, Text, UniqueConstraint
+from enum import IntEnum
+from typing import Optional
+
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, Index, Text, UniqueConstraint
 from sqlalchemy.orm import relationship
 from uuid import uuid4
 
 from .database import Base
 
+# Ordre canonique des 7 axes aromatiques (colonnes ``Product.aroma_<axe>``).
+AROMA_AXES = ("fruit", "floral", "spice", "mineral", "acidity", "body", "tannin")
+
+
+class Band(IntEnum):
+    """Bande catégorielle ordonnée (``budget_band``, ``price_band``).
+
+    Les calculs comparent des entiers ; la base et l'API conservent le
+    libellé texte (``Low``/``Medium``/``High``) via :attr:`label`.
+    """
+
+    LOW = 0
+    MEDIUM = 1
+    HIGH = 2
+
+    @property
+    def label(self) -> str:
+        return self.name.capitalize()
+
+    @classmethod
+    def from_label(cls, value: Optional[str]) -> Optional["Band"]:
+        """Libellé texte -> bande ; inconnu ou vide -> ``None``."""
+        if not value:
+            return None
+        return _BAND_BY_LABEL.get(value.strip().lower())
+
+
+_BAND_BY_LABEL = {b.name.lower(): b for b in Band}
+
 
 class Tenant(Base):
     __tablename__ = "tenants"
@@ -97,6 +129,11 @@ class Client(Base):
     email_opt_out = Column(Boolean, default=False)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False)
 
+    # Fenêtres d'activité (90/180 jours) des analyses, toujours par tenant.
+    __table_args__ = (
+        Index("ix_clients_tenant_last_purchase", "tenant_id", "last_purchase_date"),
+    )
+
     def __repr__(self) -> str:
         return f"<Client {self.client_code}>"
 
@@ -170,6 +207,13 @@ class Sale(Base):
     sale_date = Column(DateTime, nullable=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False)
 
+    # Agrégats par période (tendance des ventes) et doublons (audit R3)
+    # filtrés par tenant.
+    __table_args__ = (
+        Index("ix_sales_tenant_sale_date", "tenant_id", "sale_date"),
+        Index("ix_sales_tenant_document_product", "tenant_id", "document_id", "product_key"),
+    )
+
     def __repr__(self) -> str:
         return f"<Sale {self.document_id} - {self.product_key}>"
 
@@ -186,6 +230,8 @@ class Recommendation(Base):
     # Indicateur de validation manuelle de la recommandation
     is_approved = Column(Boolean, default=False)
 
+    __table_args__ = (Index("ix_recommendations_tenant", "tenant_id"),)
+
     def __repr__(self) -> str:
         return f"<Reco {self.client_code}->{self.product_key} ({self.score:.2f})>"
 
@@ -299,6 +345,9 @@ class ContactEvent(Base):
 
     client = relationship("Client")
 
+    # Compteurs par statut (analytics_service.get_outcomes_overview)
+    __table_args__ = (Index("ix_contact_events_tenant_status", "tenant_id", "status"),)
+
     def __repr__(self) -> str:
         return f"<ContactEvent {self.client_id} on {self.contact_date}>"
 
@@ -490,6 +539,30 @@ class AuditLog(Base):
         return f"<AuditLog {self.executed_at} score={self.score}>"
 
 
+class AnalyticsOverview(Base):
+    """
+    Instantané des indicateurs clés d'un tenant (voir ``analytics_service``).
+
+    Rafraîchi périodiquement par la tâche ``tasks.refresh_analytics``. La
+    colonne ``data_version`` reprend la sentinelle du cache analytique :
+    un instantané n'est servi que s'il correspond encore aux données.
+    """
+
+    __tablename__ = "analytics_overview"
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), primary_key=True)
+    total_clients = Column(Integer, default=0)
+    active_clients = Column(Integer, default=0)
+    churn_rate = Column(Float, default=0.0)
+    total_revenue = Column(Float, default=0.0)
+    average_order_value = Column(Float, default=0.0)
+    recommendation_count = Column(Integer, default=0)
+    data_version = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=dt.datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<AnalyticsOverview tenant={self.tenant_id} {self.updated_at}>"
+
+
 # --- Configuration settings ---
 
 class ConfigSetting(Base):
@@ -4,8 +4,8 @@ Routes d'API pour les audits de qualité des données.
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session, load_only
 
 from ..database import get_db
 from ..models import User, AuditLog
@@ -63,22 +63,51 @@ def latest_audit(
     ]
 
 
-@router.get("/logs", response_model=list[schemas.AuditLogRead])
+@router.get("/logs", response_model=list[schemas.AuditLogSummaryRead])
 def get_audit_logs(
     limit: int = 20,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> list[schemas.AuditLogRead]:
+) -> list[schemas.AuditLogSummaryRead]:
     """Retourne les logs d'audit pour le tenant courant.
 
     Ce point d'entrée est conforme à l'API décrite dans la documentation.
     On peut spécifier un nombre maximum d'éléments via le paramètre ``limit``.
+    Les ``details`` (potentiellement volumineux) ne sont ni chargés ni
+    renvoyés : voir ``GET /audit/logs/{log_id}``.
     """
     logs = (
         db.query(AuditLog)
+        .options(
+            load_only(
+                AuditLog.id,
+                AuditLog.executed_at,
+                AuditLog.errors,
+                AuditLog.warnings,
+                AuditLog.score,
+                AuditLog.tenant_id,
+            )
+        )
         .filter(AuditLog.tenant_id == current_user.tenant_id)
         .order_by(AuditLog.executed_at.desc())
         .limit(limit)
         .all()
     )
-    return logs
\ No newline at end of file
+    return logs
+
+
+@router.get("/logs/{log_id}", response_model=schemas.AuditLogRead)
+def get_audit_log(
+    log_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> schemas.AuditLogRead:
+    """Retourne un log d'audit complet, ``details`` compris."""
+    log = (
+        db.query(AuditLog)
+        .filter(AuditLog.id == log_id, AuditLog.tenant_id == current_user.tenant_id)
+        .first()
+    )
+    if not log:
+        raise HTTPException(status_code=404, detail="Log d'audit introuvable")
+    return log
\ No newline at end of file
@@ -88,40 +88,44 @@ def send_campaign(
         .filter(models.Recommendation.tenant_id == current_user.tenant_id)
         .all()
     )
-    sent = 0
-    # Envoyer un e‑mail à chaque client avec la liste de recommandations (stub)
-    for reco in recos:
-        # Récupérer l’e‑mail du client si présent dans la table clients
-        client = (
-            db.query(models.Client)
-            .filter(
-                models.Client.tenant_id == current_user.tenant_id,
-                models.Client.client_code == reco.client_code,
-            )
-            .first()
-        )
-        email_to = client.email if client and client.email else f"{reco.client_code}@example.com"
-        subject = f"Nouvelle recommandation pour {reco.client_code}"
-        html_content = (
-            f"<p>Nous vous recommandons le produit {reco.product_key} "
-            f"(score {reco.score:.2f}, scénario {reco.scenario or '-'}).</p>"
+    # E‑mail du premier client de chaque code, résolu en une seule requête
+    codes = {reco.client_code for reco in recos}
+    emails: dict = {}
+    for code, email in (
+        db.query(models.Client.client_code, models.Client.email)
+        .filter(
+            models.Client.tenant_id == current_user.tenant_id,
+            models.Client.client_code.in_(codes),
         )
-        # Envoyer l'e-mail et créer un événement de contact en passant la session,
-        # le tenant, le code client et l'identifiant de campagne. Le service Brevo
-        # enregistre également le statut initial (delivered).
-        brevo_service.send_email(
-            to=email_to,
-            subject=subject,
-            html_content=html_content,
-            cc=None,
-            db=db,
-            tenant_id=current_user.tenant_id,
-            client_code=reco.client_code,
-            campaign_id=campaign_id,
-            channel="email",
-            status="delivered",
+        .order_by(models.Client.id)
+    ):
+        emails.setdefault(code, email)
+    messages = []
+    # Un e‑mail par recommandation avec le produit recommandé (stub)
+    for reco in recos:
+        email_to = emails.get(reco.client_code) or f"{reco.client_code}@example.com"
+        messages.append(
+            {
+                "to": email_to,
+                "subject": f"Nouvelle recommandation pour {reco.client_code}",
+                "html_content": (
+                    f"<p>Nous vous recommandons le produit {reco.product_key} "
+                    f"(score {reco.score:.2f}, scénario {reco.scenario or '-'}).</p>"
+                ),
+                "client_code": reco.client_code,
+            }
         )
-        sent += 1
+    # Envoyer les e-mails et créer les événements de contact en un seul
+    # commit. Le service Brevo enregistre également le statut initial
+    # (delivered).
+    sent = brevo_service.send_email_bulk(
+        db,
+        current_user.tenant_id,
+        messages,
+        campaign_id=campaign_id,
+        channel="email",
+        status="delivered",
+    )
     # Mettre à jour le statut de la campagne
     campaign.status = "sent"
     db.commit()
@@ -174,7 +178,8 @@ def _select_contacts(
     cluster: str | None = None,
 ) -> tuple[list[dict], int]:
     query = (
-        db.query(models.NextActionOutput, models.Client)
+        db.query(models.Client.email, models.Client.client_code, models.Client.name)
+        .select_from(models.NextActionOutput)
         .join(
             models.Client,
             (models.Client.client_code == models.NextActionOutput.customer_code)
@@ -194,16 +199,16 @@ def _select_contacts(
     if cluster:
         query = query.filter(models.Client.cluster == cluster)
 
-    rows = query.order_by(models.NextActionOutput.customer_code).all()
-    n_selected = len(rows)
-    rows = rows[:batch_size]
+    # Compter l'ensemble éligible en base, ne rapatrier que le lot
+    n_selected = query.count()
+    rows = query.order_by(models.NextActionOutput.customer_code).limit(batch_size).all()
     contacts = [
         {
-            "email": client.email,
-            "customer_code": client.client_code,
-            "name": client.name,
+            "email": email,
+            "customer_code": client_code,
+            "name": name,
         }
-        for _, client in rows
+        for email, client_code, name in rows
     ]
     return contacts, n_selected
 
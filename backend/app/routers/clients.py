@@ -7,27 +7,30 @@ Permet de consulter la liste des clients et les détails d'un client.
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 
 from ..database import get_db
 from ..models import User, Client
 from ..routers.auth import get_current_user
 from .. import schemas
+from ..services import analytics_service
 
 router = APIRouter(prefix="/clients", tags=["clients"])
 
 
-@router.get("/", response_model=list[schemas.ClientRead])
+@router.get("/", response_model=list[schemas.ClientRead], response_class=ORJSONResponse)
 def list_clients(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> list[schemas.ClientRead]:
+) -> ORJSONResponse:
     """Retourne tous les clients du tenant courant."""
-    return (
+    clients = (
         db.query(Client)
         .filter(Client.tenant_id == current_user.tenant_id)
         .all()
     )
+    return ORJSONResponse(schemas.dump_clients(clients))
 
 
 @router.post("/", response_model=schemas.ClientRead, status_code=201)
@@ -116,6 +119,7 @@ def delete_client(
     if not client:
         raise HTTPException(status_code=404, detail="Client introuvable")
     db.delete(client)
+    analytics_service.invalidate_cache(current_user.tenant_id, db)
     db.commit()
     return {"message": "Client supprimé"}
 
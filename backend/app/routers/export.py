@@ -18,12 +18,11 @@ filtrer les données. Un paramètre ``format`` permet de choisir entre
 from __future__ import annotations
 
 import io
-import json
 from typing import List
 
 import pandas as pd
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse, JSONResponse
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
@@ -203,12 +202,7 @@ def export_run_summary(
     run_id: str,
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db),
-) -> JSONResponse:
+) -> ORJSONResponse:
     run = _get_run_or_404(run_id, current_user.tenant_id, db)
-    summary = {}
-    if run.summary and run.summary.summary_json:
-        try:
-            summary = json.loads(run.summary.summary_json)
-        except Exception:
-            summary = {}
-    return JSONResponse(content={"run_id": run_id, "summary": summary})
+    summary = schemas.parse_summary_json(run.summary.summary_json) if run.summary else {}
+    return ORJSONResponse(content={"run_id": run_id, "summary": summary})
@@ -5,6 +5,7 @@ Routes d'API pour la gestion des produits.
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 
 from ..database import get_db
@@ -15,17 +16,23 @@ from .. import schemas
 router = APIRouter(prefix="/products", tags=["products"])
 
 
-@router.get("/", response_model=list[schemas.ProductRead])
+@router.get("/", response_model=list[schemas.ProductListRead], response_class=ORJSONResponse)
 def list_products(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> list[schemas.ProductRead]:
-    """Retourne les produits pour le tenant courant."""
-    return (
-        db.query(Product)
+) -> ORJSONResponse:
+    """Retourne le catalogue du tenant courant.
+
+    Projection allégée (sans description ni axes aromatiques) : le détail
+    complet d'un produit reste disponible via ``GET /products/{product_key}``.
+    """
+    columns = [getattr(Product, name) for name in schemas.ProductListRow._fields]
+    rows = (
+        db.query(*columns)
         .filter(Product.tenant_id == current_user.tenant_id)
         .all()
     )
+    return ORJSONResponse(schemas.dump_product_list_rows(rows))
 
 
 @router.post("/", response_model=schemas.ProductRead, status_code=201)
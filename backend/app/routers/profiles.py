@@ -13,6 +13,7 @@ from __future__ import annotations
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 
 from ..database import get_db
@@ -25,18 +26,18 @@ from ..services import rfm_service, preference_service, aroma_service
 router = APIRouter(prefix="/profiles", tags=["profiles"])
 
 
-@router.get("/", response_model=List[schemas.ClientRead])
+@router.get("/", response_model=List[schemas.ClientRead], response_class=ORJSONResponse)
 def list_profiles(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> List[schemas.ClientRead]:
+) -> ORJSONResponse:
     """Liste les profils complets de tous les clients du tenant courant."""
     clients = (
         db.query(Client)
         .filter(Client.tenant_id == current_user.tenant_id)
         .all()
     )
-    return clients
+    return ORJSONResponse(schemas.dump_clients(clients))
 
 
 @router.get("/{client_code}", response_model=schemas.ClientRead)
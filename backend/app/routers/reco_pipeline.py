@@ -1,9 +1,8 @@
 from __future__ import annotations
 
-import json
 from typing import Any, Dict
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
@@ -15,12 +14,9 @@ router = APIRouter(prefix="/reco", tags=["reco"])
 
 
 def _parse_summary(summary: models.RunSummary | None) -> Dict[str, Any]:
-    if not summary or not summary.summary_json:
-        return {}
-    try:
-        return json.loads(summary.summary_json)
-    except Exception:
+    if not summary:
         return {}
+    return schemas.parse_summary_json(summary.summary_json)
 
 
 @router.post("/run", response_model=schemas.RecoRunDetail)
@@ -60,10 +56,8 @@ def trigger_reco_run(
     return schemas.RecoRunDetail(
         run=schemas.RecoRunRead.model_validate(run, from_attributes=True),
         summary=result.get("summary"),
-        next_actions=[
-            schemas.NextActionOutputRead.model_validate(na, from_attributes=True) for na in next_actions
-        ],
-        top_audit=[schemas.AuditOutputRead.model_validate(a, from_attributes=True) for a in audit_rows],
+        next_actions=schemas.NextActionsReadBatch.validate_python(next_actions, from_attributes=True),
+        top_audit=schemas.AuditOutputsReadBatch.validate_python(audit_rows, from_attributes=True),
     )
 
 
@@ -72,7 +66,7 @@ def list_runs(
     limit: int = Query(50, ge=1, le=200),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
-) -> list[schemas.RecoRunRead]:
+) -> Response:
     runs = (
         db.query(models.RecoRun)
         .filter(models.RecoRun.tenant_id == current_user.tenant_id)
@@ -80,7 +74,10 @@ def list_runs(
         .limit(limit)
         .all()
     )
-    return runs
+    return Response(
+        content=schemas.dump_json_list(schemas.RecoRunsReadBatch, runs),
+        media_type="application/json",
+    )
 
 
 @router.get("/runs/{run_id}", response_model=schemas.RecoRunDetail)
@@ -113,8 +110,6 @@ def get_run_detail(
     return schemas.RecoRunDetail(
         run=schemas.RecoRunRead.model_validate(run, from_attributes=True),
         summary=summary,
-        next_actions=[
-            schemas.NextActionOutputRead.model_validate(na, from_attributes=True) for na in next_actions
-        ],
-        top_audit=[schemas.AuditOutputRead.model_validate(a, from_attributes=True) for a in audit_rows],
+        next_actions=schemas.NextActionsReadBatch.validate_python(next_actions, from_attributes=True),
+        top_audit=schemas.AuditOutputsReadBatch.validate_python(audit_rows, from_attributes=True),
     )
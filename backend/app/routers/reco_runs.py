@@ -12,7 +12,8 @@ from __future__ import annotations
 
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
@@ -29,7 +30,7 @@ def list_reco_runs(
     offset: int = Query(0, description="Décalage pour la pagination"),
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db),
-) -> List[schemas.RecoRunRead]:
+) -> Response:
     """Retourne la liste des runs de recommandations pour le tenant courant."""
     runs = (
         db.query(models.RecoRun)
@@ -39,10 +40,13 @@ def list_reco_runs(
         .limit(limit)
         .all()
     )
-    return runs
+    return Response(
+        content=schemas.dump_json_list(schemas.RecoRunsReadBatch, runs),
+        media_type="application/json",
+    )
 
 
-@router.get("/{run_id}/items", response_model=List[schemas.RecoItemRead])
+@router.get("/{run_id}/items", response_model=List[schemas.RecoItemRead], response_class=ORJSONResponse)
 def list_reco_items_for_run(
     run_id: int,
     client_id: Optional[int] = Query(
@@ -50,7 +54,7 @@ def list_reco_items_for_run(
     ),
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db),
-) -> List[schemas.RecoItemRead]:
+) -> ORJSONResponse:
     """Retourne les recommandations générées lors d’un run spécifique."""
     # Vérifier que le run appartient au tenant
     run = (
@@ -60,10 +64,12 @@ def list_reco_items_for_run(
     )
     if not run:
         raise HTTPException(status_code=404, detail="Run introuvable")
-    query = db.query(models.RecoItem).filter(
+    # Lecture colonne par colonne : pas d'objets ORM à matérialiser
+    columns = [getattr(models.RecoItem, name) for name in schemas.RecoItemRow._fields]
+    query = db.query(*columns).filter(
         models.RecoItem.run_id == run_id, models.RecoItem.tenant_id == current_user.tenant_id
     )
     if client_id:
         query = query.filter(models.RecoItem.client_id == client_id)
-    items = query.order_by(models.RecoItem.rank.asc()).all()
-    return items
\ No newline at end of file
+    rows = query.order_by(models.RecoItem.rank.asc()).all()
+    return ORJSONResponse(schemas.dump_reco_item_rows(rows))
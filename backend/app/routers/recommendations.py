@@ -7,7 +7,7 @@ tenant donné et de consulter les recommandations existantes d’un client.
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
@@ -18,19 +18,27 @@ from ..services.recommendation_engine import generate_recommendations
 router = APIRouter(prefix="/recommendations", tags=["recommendations"])
 
 
+def _json_recommendations(recos: list[models.Recommendation]) -> Response:
+    # Validation et sérialisation de la liste en un seul passage pydantic-core
+    return Response(
+        content=schemas.dump_json_list(schemas.RecommendationsReadBatch, recos),
+        media_type="application/json",
+    )
+
+
 @router.post("/generate", response_model=list[schemas.RecommendationRead])
 def generate_recos_for_tenant(
     top_n: int = 5,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
-) -> list[schemas.RecommendationRead]:
+) -> Response:
     """Génère des recommandations pour tous les clients du tenant courant.
 
     Le paramètre ``top_n`` contrôle le nombre de recommandations retournées
     par client.
     """
     recos = generate_recommendations(db, tenant_id=current_user.tenant_id, top_n=top_n)
-    return recos
+    return _json_recommendations(recos)
 
 
 @router.get("/client/{client_code}", response_model=list[schemas.RecommendationRead])
@@ -38,7 +46,7 @@ def get_recommendations_for_client(
     client_code: str,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
-) -> list[schemas.RecommendationRead]:
+) -> Response:
     """Retourne les recommandations pour un client donné dans le tenant courant."""
     recos = (
         db.query(models.Recommendation)
@@ -48,21 +56,21 @@ def get_recommendations_for_client(
         )
         .all()
     )
-    return recos
+    return _json_recommendations(recos)
 
 
 @router.get("/", response_model=list[schemas.RecommendationRead])
 def get_all_recommendations(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
-) -> list[schemas.RecommendationRead]:
+) -> Response:
     """Retourne l’ensemble des recommandations pour le tenant courant."""
     recos = (
         db.query(models.Recommendation)
         .filter(models.Recommendation.tenant_id == current_user.tenant_id)
         .all()
     )
-    return recos
+    return _json_recommendations(recos)
 
 
 @router.post("/approve")
@@ -13,18 +13,20 @@ import datetime as dt
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 
 from ..database import get_db
 from ..models import User, Sale
 from ..routers.auth import get_current_user
 from .. import schemas
+from ..services import analytics_service
 
 
 router = APIRouter(prefix="/sales", tags=["sales"])
 
 
-@router.get("/", response_model=List[schemas.SaleRead])
+@router.get("/", response_model=List[schemas.SaleRead], response_class=ORJSONResponse)
 def list_sales(
     customer_code: Optional[str] = Query(None, alias="customer"),
     product_key: Optional[str] = Query(None, alias="product"),
@@ -32,7 +34,7 @@ def list_sales(
     end_date: Optional[dt.datetime] = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> List[schemas.SaleRead]:
+) -> ORJSONResponse:
     """Retourne les ventes du tenant courant, avec filtres optionnels.
 
     Les filtres disponibles permettent de sélectionner les ventes par code client,
@@ -47,15 +49,15 @@ def list_sales(
         query = query.filter(Sale.sale_date >= start_date)
     if end_date:
         query = query.filter(Sale.sale_date <= end_date)
-    return query.all()
+    return ORJSONResponse(schemas.dump_sales(query.all()))
 
 
-@router.get("/customer/{client_code}", response_model=List[schemas.SaleRead])
+@router.get("/customer/{client_code}", response_model=List[schemas.SaleRead], response_class=ORJSONResponse)
 def get_sales_by_customer(
     client_code: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> List[schemas.SaleRead]:
+) -> ORJSONResponse:
     """Retourne l'historique des ventes pour un client donné."""
     sales = (
         db.query(Sale)
@@ -66,7 +68,7 @@ def get_sales_by_customer(
         .order_by(Sale.sale_date.desc())
         .all()
     )
-    return sales
+    return ORJSONResponse(schemas.dump_sales(sales))
 
 
 @router.post("/", response_model=schemas.SaleRead, status_code=201)
@@ -120,6 +122,7 @@ def update_sale(
     for field, value in update_data.items():
         setattr(sale, field, value)
     db.add(sale)
+    analytics_service.invalidate_cache(current_user.tenant_id, db)
     db.commit()
     db.refresh(sale)
     return sale
@@ -148,5 +151,6 @@ def delete_sale(
     if not sale:
         raise HTTPException(status_code=404, detail="Vente introuvable")
     db.delete(sale)
+    analytics_service.invalidate_cache(current_user.tenant_id, db)
     db.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -8,9 +8,67 @@ mettre à jour les objets, et en classes de lecture (R) retournées par l’API.
 from __future__ import annotations
 
 import datetime as dt
-from typing import Optional
+import re
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Annotated, Any, Iterable, Literal, NamedTuple, Optional, TypedDict
+
+from email_validator.rfc_constants import CASE_INSENSITIVE_MAILBOX_NAMES
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    ConfigDict,
+    EmailStr,
+    Field,
+    TypeAdapter,
+    computed_field,
+    field_validator,
+)
+
+
+# Contrôle de forme minimal des e-mails sur les chemins d'ingestion : une
+# seule regex précompilée plutôt que la validation RFC complète d'EmailStr.
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+def _check_email(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    value = value.strip()
+    if not _EMAIL_RE.match(value):
+        raise ValueError("adresse e-mail invalide")
+    return value
+
+
+Email = Annotated[Optional[str], AfterValidator(_check_email)]
+
+
+# Domaines fermés des statuts, appliqués aux seuls schémas d'entrée : les
+# colonnes sont des ``String`` libres et les schémas de lecture relisent
+# telles quelles les valeurs déjà en base.
+CampaignStatus = Literal["draft", "scheduled", "sent", "failed"]
+RecoRunStatus = Literal["running", "completed", "failed"]
 
-from pydantic import BaseModel, ConfigDict, EmailStr, field_validator, TypeAdapter
+
+# Types de champs partagés entre schémas. Les bornes de longueur de
+# ClientCode/ProductKey ne s'appliquent qu'aux schémas d'entrée : les
+# colonnes sont des ``String`` non bornés (clés produit dérivées des
+# libellés par l'ETL) et les schémas de lecture les relisent en ``str``.
+TenantId = Annotated[int, Field(ge=1)]
+ClientCode = Annotated[str, Field(max_length=64)]
+ProductKey = Annotated[str, Field(max_length=128)]
+OptDateTime = Optional[dt.datetime]
+
+
+# Configuration partagée par les schémas de lecture (jamais modifiés après
+# construction).
+_READ_CONFIG = ConfigDict(
+    from_attributes=True, extra="ignore", frozen=True, validate_assignment=False
+)
+
+# Schémas de mise à jour partielle : peu utilisés, leur schéma pydantic-core
+# n'est construit qu'au premier usage plutôt qu'à l'import du module.
+_UPDATE_CONFIG = ConfigDict(from_attributes=True, defer_build=True)
 
 
 # --- Tenant ---
@@ -28,17 +86,18 @@ class TenantRead(TenantBase):
     id: int
     created_at: dt.datetime
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _READ_CONFIG
 
 
 # --- User ---
 
 class UserBase(BaseModel):
     username: str
+    # Création de comptes : validation stricte conservée (faible volume)
     email: Optional[EmailStr] = None
-    is_active: Optional[bool] = True
-    is_superuser: Optional[bool] = False
-    tenant_id: int
+    is_active: bool = True
+    is_superuser: bool = False
+    tenant_id: TenantId
 
 
 class UserCreate(UserBase):
@@ -48,36 +107,32 @@ class UserCreate(UserBase):
 class UserRead(UserBase):
     id: int
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _READ_CONFIG
 
 
 # --- Client ---
 
-class ClientBase(BaseModel):
+class ClientWriteBase(BaseModel):
+    """Champs d'un client modifiables via l'API.
+
+    Les indicateurs calculés (RFM, CA, etc.) ne sont exposés qu'en lecture
+    par :class:`ClientRead` : les payloads de création ne les valident pas.
+    """
+
     client_code: str
     name: Optional[str] = None
-    email: Optional[EmailStr] = None
-    tenant_id: int
-    # Champs calculés optionnels (exposés uniquement en lecture)
-    last_purchase_date: Optional[dt.datetime] = None
-    total_spent: Optional[float] = None
-    total_orders: Optional[int] = None
-    average_order_value: Optional[float] = None
-    recency: Optional[float] = None
-    frequency: Optional[float] = None
-    monetary: Optional[float] = None
-    rfm_score: Optional[int] = None
-    rfm_segment: Optional[str] = None
+    email: Email = None
+    tenant_id: TenantId
+    last_contact_date: OptDateTime = None
+    email_opt_out: bool = False
     preferred_families: Optional[str] = None
     budget_band: Optional[str] = None
     aroma_profile: Optional[str] = None
     cluster: Optional[str] = None
-    last_contact_date: Optional[dt.datetime] = None
-    email_opt_out: Optional[bool] = False
 
 
-class ClientCreate(ClientBase):
-    pass
+class ClientCreate(ClientWriteBase):
+    client_code: ClientCode
 
 
 class ClientUpdate(BaseModel):
@@ -88,37 +143,95 @@ class ClientUpdate(BaseModel):
     """
 
     name: Optional[str] = None
-    email: Optional[EmailStr] = None
-    last_contact_date: Optional[dt.datetime] = None
+    email: Email = None
+    last_contact_date: OptDateTime = None
     email_opt_out: Optional[bool] = None
     preferred_families: Optional[str] = None
     budget_band: Optional[str] = None
     aroma_profile: Optional[str] = None
     cluster: Optional[str] = None
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _UPDATE_CONFIG
+
+
+_EMAIL_STR_ADAPTER = TypeAdapter(EmailStr)
+
 
+def _average_order_value(total_spent: Optional[float], total_orders: Optional[int]) -> Optional[float]:
+    """Panier moyen dérivé, identique au calcul RFM (0.0 sans commande)."""
+    if total_spent is None or total_orders is None:
+        return None
+    return total_spent / total_orders if total_orders > 0 else 0.0
+
+
+# Forme ASCII courante (dot-atom simple, domaine à labels alphanumériques) :
+# email-validator l'accepte telle quelle en ne minusculant que le domaine, on
+# évite donc l'aller-retour pydantic-core pour la quasi-totalité des lignes.
+# Un domaine contenant « -- » (punycode, tirets réservés en positions 3-4
+# d'un label) est laissé à l'adaptateur.
+_SIMPLE_EMAIL_RE = re.compile(
+    r"^([A-Za-z0-9_+-]+(?:\.[A-Za-z0-9_+-]+)*)@"
+    r"((?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z]{2,63})$"
+)
+# TLD réservés refusés par email-validator : on les laisse à l'adaptateur.
+_SPECIAL_USE_TLDS = frozenset({"arpa", "invalid", "local", "localhost", "onion", "test"})
+# Boîtes génériques (postmaster, info, sales...) dont email-validator met
+# la partie locale en minuscules : on les laisse aussi à l'adaptateur.
+_CASE_INSENSITIVE_MAILBOXES = frozenset(CASE_INSENSITIVE_MAILBOX_NAMES)
+
+
+def _normalize_email(value: object) -> Optional[str]:
+    """Nettoie un e-mail stocké en base : invalide ou vide -> ``None``."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        cleaned = value.strip()
+        if cleaned == "":
+            return None
+        match = _SIMPLE_EMAIL_RE.match(cleaned)
+        if (
+            match is not None
+            and len(cleaned) <= 254
+            and len(match[1]) <= 64
+            and "--" not in match[2]
+            and match[1].lower() not in _CASE_INSENSITIVE_MAILBOXES
+        ):
+            domain = match[2].lower()
+            if domain.rpartition(".")[2] not in _SPECIAL_USE_TLDS:
+                return f"{match[1]}@{domain}"
+        try:
+            return _EMAIL_STR_ADAPTER.validate_python(cleaned)
+        except Exception:
+            return None
+    return None
 
-class ClientRead(ClientBase):
+
+class ClientRead(ClientWriteBase):
     email: Optional[str] = None
+    # Les lignes importées par l'ETL peuvent laisser la colonne à NULL
+    email_opt_out: Optional[bool] = False
+    # Champs calculés (exposés uniquement en lecture)
+    last_purchase_date: OptDateTime = None
+    total_spent: Optional[float] = None
+    total_orders: Optional[int] = None
+    recency: Optional[float] = None
+    frequency: Optional[float] = None
+    monetary: Optional[float] = None
+    rfm_score: Optional[int] = None
+    rfm_segment: Optional[str] = None
     id: int
 
     @field_validator("email", mode="before")
     @classmethod
     def normalize_email(cls, value: object) -> Optional[str]:
-        if value is None:
-            return None
-        if isinstance(value, str):
-            cleaned = value.strip()
-            if cleaned == "":
-                return None
-            try:
-                return TypeAdapter(EmailStr).validate_python(cleaned)
-            except Exception:
-                return None
-        return None
+        return _normalize_email(value)
+
+    @computed_field
+    @cached_property
+    def average_order_value(self) -> Optional[float]:
+        return _average_order_value(self.total_spent, self.total_orders)
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _READ_CONFIG
 
 
 
@@ -144,14 +257,14 @@ class ProductBase(BaseModel):
     aroma_tannin: Optional[float] = None
     global_popularity_score: Optional[float] = None
     season_tags: Optional[str] = None
-    is_active: Optional[bool] = True
-    is_archived: Optional[bool] = False
+    is_active: bool = True
+    is_archived: bool = False
     description: Optional[str] = None
-    tenant_id: int
+    tenant_id: TenantId
 
 
 class ProductCreate(ProductBase):
-    pass
+    product_key: ProductKey
 
 
 class ProductUpdate(BaseModel):
@@ -183,14 +296,32 @@ class ProductUpdate(BaseModel):
     is_archived: Optional[bool] = None
     description: Optional[str] = None
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _UPDATE_CONFIG
 
 
 class ProductRead(ProductBase):
+    # Colonnes nullables côté base (imports ETL)
+    is_active: Optional[bool] = True
+    is_archived: Optional[bool] = False
     id: int
 
-    class Config:
-        orm_mode = True
+    model_config = _READ_CONFIG
+
+
+class ProductListRead(BaseModel):
+    """Projection catalogue : sans description ni axes aromatiques."""
+
+    id: int
+    product_key: str
+    name: str
+    family_crm: Optional[str] = None
+    price_ttc: Optional[float] = None
+    price_band: Optional[str] = None
+    global_popularity_score: Optional[float] = None
+    is_active: Optional[bool] = True
+    tenant_id: TenantId
+
+    model_config = _READ_CONFIG
 
 
 # --- Sale ---
@@ -201,18 +332,19 @@ class SaleBase(BaseModel):
     client_code: str
     quantity: Optional[float] = None
     amount: Optional[float] = None
-    sale_date: Optional[dt.datetime] = None
-    tenant_id: int
+    sale_date: OptDateTime = None
+    tenant_id: TenantId
 
 
 class SaleCreate(SaleBase):
-    pass
+    product_key: ProductKey
+    client_code: ClientCode
 
 
 class SaleRead(SaleBase):
     id: int
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _READ_CONFIG
 
 
 # --- SaleUpdate ---
@@ -229,7 +361,9 @@ class SaleUpdate(BaseModel):
     client_code: Optional[str] = None
     quantity: Optional[float] = None
     amount: Optional[float] = None
-    sale_date: Optional[dt.datetime] = None
+    sale_date: OptDateTime = None
+
+    model_config = _UPDATE_CONFIG
 
 
 # --- Order & OrderItem ---
@@ -239,7 +373,7 @@ class OrderItemBase(BaseModel):
     quantity: Optional[float] = None
     unit_price: Optional[float] = None
     total_price: Optional[float] = None
-    tenant_id: int
+    tenant_id: TenantId
 
 
 class OrderItemCreate(OrderItemBase):
@@ -250,37 +384,37 @@ class OrderItemRead(OrderItemBase):
     id: int
     order_id: int
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _READ_CONFIG
 
 
 class OrderBase(BaseModel):
     client_id: int
     total_amount: Optional[float] = None
-    created_at: Optional[dt.datetime] = None
+    created_at: OptDateTime = None
     status: Optional[str] = None
-    tenant_id: int
+    tenant_id: TenantId
 
 
 class OrderCreate(OrderBase):
-    items: list[OrderItemCreate]
+    items: tuple[OrderItemCreate, ...]
 
 
 class OrderRead(OrderBase):
     id: int
-    items: list[OrderItemRead]
+    items: tuple[OrderItemRead, ...]
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _READ_CONFIG
 
 
 # --- ContactEvent ---
 
 class ContactEventBase(BaseModel):
     client_id: int
-    contact_date: Optional[dt.datetime] = None
+    contact_date: OptDateTime = None
     channel: Optional[str] = None
     status: Optional[str] = None
     campaign_id: Optional[int] = None
-    tenant_id: int
+    tenant_id: TenantId
 
 
 class ContactEventCreate(ContactEventBase):
@@ -290,40 +424,40 @@ class ContactEventCreate(ContactEventBase):
 class ContactEventRead(ContactEventBase):
     id: int
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _READ_CONFIG
 
 
 # --- RecoRun & Reco Outputs ---
 
 class RecoRunBase(BaseModel):
     run_id: Optional[str] = None
-    started_at: Optional[dt.datetime] = None
-    finished_at: Optional[dt.datetime] = None
-    executed_at: Optional[dt.datetime] = None
+    started_at: OptDateTime = None
+    finished_at: OptDateTime = None
+    executed_at: OptDateTime = None
     dataset_version: Optional[str] = None
     config_hash: Optional[str] = None
     code_version: Optional[str] = None
     status: Optional[str] = None
-    tenant_id: int
+    tenant_id: TenantId
 
 
 class RecoRunCreate(RecoRunBase):
-    pass
+    status: Optional[RecoRunStatus] = None
 
 
 class RunSummaryRead(BaseModel):
     run_id: str
     summary_json: Optional[str] = None
-    tenant_id: int
+    tenant_id: TenantId
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _READ_CONFIG
 
 
 class RecoRunRead(RecoRunBase):
     id: int
     summary: Optional[RunSummaryRead] = None
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _READ_CONFIG
 
 
 class RecoItemBase(BaseModel):
@@ -335,7 +469,7 @@ class RecoItemBase(BaseModel):
     score: Optional[float] = None
     explain_short: Optional[str] = None
     reasons_json: Optional[str] = None
-    tenant_id: int
+    tenant_id: TenantId
 
 
 class RecoItemCreate(RecoItemBase):
@@ -345,7 +479,7 @@ class RecoItemCreate(RecoItemBase):
 class RecoItemRead(RecoItemBase):
     id: int
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _READ_CONFIG
 
 
 class RecoOutputBase(BaseModel):
@@ -357,13 +491,13 @@ class RecoOutputBase(BaseModel):
     score: Optional[float] = None
     explain_short: Optional[str] = None
     reasons_json: Optional[str] = None
-    tenant_id: int
+    tenant_id: TenantId
 
 
 class RecoOutputRead(RecoOutputBase):
     id: int
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _READ_CONFIG
 
 
 class AuditOutputBase(BaseModel):
@@ -372,13 +506,13 @@ class AuditOutputBase(BaseModel):
     severity: str
     rule_code: str
     details_json: Optional[str] = None
-    tenant_id: int
+    tenant_id: TenantId
 
 
 class AuditOutputRead(AuditOutputBase):
     id: int
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _READ_CONFIG
 
 
 class NextActionOutputBase(BaseModel):
@@ -388,13 +522,13 @@ class NextActionOutputBase(BaseModel):
     reason: Optional[str] = None
     scenario: Optional[str] = None
     audit_score: Optional[float] = None
-    tenant_id: int
+    tenant_id: TenantId
 
 
 class NextActionOutputRead(NextActionOutputBase):
     id: int
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _READ_CONFIG
 
 
 class RecoRunDetail(BaseModel):
@@ -413,9 +547,9 @@ class BrevoLogRead(BaseModel):
     action: str
     payload_redacted: Optional[str] = None
     status: str
-    created_at: Optional[dt.datetime] = None
+    created_at: OptDateTime = None
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _READ_CONFIG
 
 
 class ContactHistoryRead(BaseModel):
@@ -426,93 +560,7 @@ class ContactHistoryRead(BaseModel):
     status: Optional[str] = None
     meta: Optional[str] = None
 
-    model_config = ConfigDict(from_attributes=True)
-
-
-class RecoOutputBase(BaseModel):
-    run_id: str
-    customer_code: str
-    scenario: Optional[str] = None
-    rank: Optional[int] = None
-    product_key: str
-    score: Optional[float] = None
-    explain_short: Optional[str] = None
-    reasons_json: Optional[str] = None
-    tenant_id: int
-
-
-class RecoOutputRead(RecoOutputBase):
-    id: int
-
-    class Config:
-        orm_mode = True
-
-
-class AuditOutputBase(BaseModel):
-    run_id: str
-    customer_code: str
-    severity: str
-    rule_code: str
-    details_json: Optional[str] = None
-    tenant_id: int
-
-
-class AuditOutputRead(AuditOutputBase):
-    id: int
-
-    class Config:
-        orm_mode = True
-
-
-class NextActionOutputBase(BaseModel):
-    run_id: str
-    customer_code: str
-    eligible: bool
-    reason: Optional[str] = None
-    scenario: Optional[str] = None
-    audit_score: Optional[float] = None
-    tenant_id: int
-
-
-class NextActionOutputRead(NextActionOutputBase):
-    id: int
-
-    class Config:
-        orm_mode = True
-
-
-class RecoRunDetail(BaseModel):
-    run: RecoRunRead
-    summary: Optional[dict] = None
-    next_actions: list[NextActionOutputRead] = []
-    top_audit: list[AuditOutputRead] = []
-
-
-# --- Brevo ---
-
-class BrevoLogRead(BaseModel):
-    id: int
-    run_id: Optional[str] = None
-    batch_id: Optional[str] = None
-    action: str
-    payload_redacted: Optional[str] = None
-    status: str
-    created_at: Optional[dt.datetime] = None
-
-    class Config:
-        orm_mode = True
-
-
-class ContactHistoryRead(BaseModel):
-    id: int
-    customer_code: str
-    last_contact_at: dt.datetime
-    channel: Optional[str] = None
-    status: Optional[str] = None
-    meta: Optional[str] = None
-
-    class Config:
-        orm_mode = True
+    model_config = _READ_CONFIG
 
 
 # --- Recommendation ---
@@ -522,40 +570,42 @@ class RecommendationBase(BaseModel):
     product_key: str
     score: float
     scenario: Optional[str] = None
-    tenant_id: int
-    is_approved: Optional[bool] = False
+    tenant_id: TenantId
+    is_approved: bool = False
 
 
 class RecommendationCreate(RecommendationBase):
-    pass
+    client_code: ClientCode
+    product_key: ProductKey
 
 
 class RecommendationRead(RecommendationBase):
+    is_approved: Optional[bool] = False
     id: int
     created_at: dt.datetime
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _READ_CONFIG
 
 
 # --- Campaign ---
 
 class CampaignBase(BaseModel):
     name: str
-    scheduled_at: Optional[dt.datetime] = None
+    scheduled_at: OptDateTime = None
     status: Optional[str] = "draft"
     template_id: Optional[str] = None
-    tenant_id: int
+    tenant_id: TenantId
 
 
 class CampaignCreate(CampaignBase):
-    pass
+    status: Optional[CampaignStatus] = "draft"
 
 
 class CampaignRead(CampaignBase):
     id: int
     created_at: dt.datetime
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _READ_CONFIG
 
 
 # --- AuditLog ---
@@ -566,13 +616,26 @@ class AuditLogBase(BaseModel):
     warnings: int
     score: float
     details: Optional[str] = None
-    tenant_id: int
+    tenant_id: TenantId
 
 
 class AuditLogRead(AuditLogBase):
     id: int
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _READ_CONFIG
+
+
+class AuditLogSummaryRead(BaseModel):
+    """Ligne de journal d'audit sans ``details`` (listes)."""
+
+    id: int
+    executed_at: dt.datetime
+    errors: int
+    warnings: int
+    score: float
+    tenant_id: TenantId
+
+    model_config = _READ_CONFIG
 
 
 # --- ConfigSetting ---
@@ -597,12 +660,14 @@ class ConfigSettingUpdate(BaseModel):
     value: Optional[str] = None
     description: Optional[str] = None
 
+    model_config = _UPDATE_CONFIG
+
 
 class ConfigSettingRead(ConfigSettingBase):
     id: int
-    tenant_id: int
+    tenant_id: TenantId
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = _READ_CONFIG
 
 
 # ------------------ Aliases ------------------
@@ -621,6 +686,7 @@ class ProductAliasBase(BaseModel):
 class ProductAliasCreate(ProductAliasBase):
     """Schéma pour créer un nouvel alias de produit."""
 
+    product_key: ProductKey
     tenant_id: Optional[int] = None
 
 
@@ -633,14 +699,489 @@ class ProductAliasUpdate(BaseModel):
     confidence: Optional[float] = None
     source: Optional[str] = None
 
+    model_config = _UPDATE_CONFIG
+
 
 class ProductAliasRead(ProductAliasBase):
     """Schéma de lecture pour un alias de produit."""
 
     id: int
+    tenant_id: TenantId
+    created_at: OptDateTime = None
+    updated_at: OptDateTime = None
+
+    model_config = _READ_CONFIG
+
+
+# ------------------ Projections pour les listes ------------------
+#
+# Les endpoints de liste renvoient des milliers de lignes dont seul le dict
+# sérialisé est consommé : on construit directement des dataclasses slottées
+# depuis les objets ORM, puis un dict équivalent à
+# ``XRead.model_dump(exclude_none=True)``, sans passer par la validation
+# pydantic. Les schémas ``XRead`` restent déclarés en ``response_model`` pour
+# la documentation OpenAPI.
+#
+# Les fonctions ``_x_dc_to_dict`` sont volontairement écrites « à plat »
+# (un test par champ, dans l'ordre de ``model_fields``) et les ``dump_x``
+# lient leurs fonctions en variables locales hors de la boucle. Toute
+# évolution d'un schéma ``XRead`` doit être reportée ici : les tests de
+# parité de ``backend/tests`` le vérifient.
+
+@dataclass(slots=True)
+class ClientReadDC:
+    id: int
+    tenant_id: int
+    client_code: str
+    name: Optional[str] = None
+    email: Optional[str] = None
+    last_purchase_date: Optional[dt.datetime] = None
+    total_spent: Optional[float] = None
+    total_orders: Optional[int] = None
+    average_order_value: Optional[float] = None
+    recency: Optional[float] = None
+    frequency: Optional[float] = None
+    monetary: Optional[float] = None
+    rfm_score: Optional[int] = None
+    rfm_segment: Optional[str] = None
+    preferred_families: Optional[str] = None
+    budget_band: Optional[str] = None
+    aroma_profile: Optional[str] = None
+    cluster: Optional[str] = None
+    last_contact_date: Optional[dt.datetime] = None
+    email_opt_out: Optional[bool] = False
+
+    @classmethod
+    def from_orm(cls, obj: Any) -> "ClientReadDC":
+        return cls(
+            id=obj.id,
+            tenant_id=obj.tenant_id,
+            client_code=obj.client_code,
+            name=obj.name,
+            email=_normalize_email(obj.email),
+            last_purchase_date=obj.last_purchase_date,
+            total_spent=obj.total_spent,
+            total_orders=obj.total_orders,
+            average_order_value=_average_order_value(obj.total_spent, obj.total_orders),
+            recency=obj.recency,
+            frequency=obj.frequency,
+            monetary=obj.monetary,
+            rfm_score=obj.rfm_score,
+            rfm_segment=obj.rfm_segment,
+            preferred_families=obj.preferred_families,
+            budget_band=obj.budget_band,
+            aroma_profile=obj.aroma_profile,
+            cluster=obj.cluster,
+            last_contact_date=obj.last_contact_date,
+            email_opt_out=obj.email_opt_out,
+        )
+
+
+class ClientReadDict(TypedDict, total=False):
+    """Projection ``dict`` d'un client telle que renvoyée par les listes."""
+
+    client_code: str
+    name: str
+    email: str
+    tenant_id: int
+    last_contact_date: dt.datetime
+    email_opt_out: bool
+    preferred_families: str
+    budget_band: str
+    aroma_profile: str
+    cluster: str
+    last_purchase_date: dt.datetime
+    total_spent: float
+    total_orders: int
+    recency: float
+    frequency: float
+    monetary: float
+    rfm_score: int
+    rfm_segment: str
+    id: int
+    average_order_value: float
+
+
+def _client_dc_to_dict(dc: ClientReadDC) -> ClientReadDict:
+    out: ClientReadDict = {"client_code": dc.client_code}
+    if dc.name is not None:
+        out["name"] = dc.name
+    if dc.email is not None:
+        out["email"] = dc.email
+    out["tenant_id"] = dc.tenant_id
+    if dc.last_contact_date is not None:
+        out["last_contact_date"] = dc.last_contact_date
+    if dc.email_opt_out is not None:
+        out["email_opt_out"] = dc.email_opt_out
+    if dc.preferred_families is not None:
+        out["preferred_families"] = dc.preferred_families
+    if dc.budget_band is not None:
+        out["budget_band"] = dc.budget_band
+    if dc.aroma_profile is not None:
+        out["aroma_profile"] = dc.aroma_profile
+    if dc.cluster is not None:
+        out["cluster"] = dc.cluster
+    if dc.last_purchase_date is not None:
+        out["last_purchase_date"] = dc.last_purchase_date
+    if dc.total_spent is not None:
+        out["total_spent"] = dc.total_spent
+    if dc.total_orders is not None:
+        out["total_orders"] = dc.total_orders
+    if dc.recency is not None:
+        out["recency"] = dc.recency
+    if dc.frequency is not None:
+        out["frequency"] = dc.frequency
+    if dc.monetary is not None:
+        out["monetary"] = dc.monetary
+    if dc.rfm_score is not None:
+        out["rfm_score"] = dc.rfm_score
+    if dc.rfm_segment is not None:
+        out["rfm_segment"] = dc.rfm_segment
+    out["id"] = dc.id
+    if dc.average_order_value is not None:
+        out["average_order_value"] = dc.average_order_value
+    return out
+
+
+@dataclass(slots=True)
+class ProductReadDC:
+    id: int
+    tenant_id: int
+    product_key: str
+    name: str
+    family_crm: Optional[str] = None
+    sub_family: Optional[str] = None
+    cepage: Optional[str] = None
+    sucrosite_niveau: Optional[str] = None
+    price_ttc: Optional[float] = None
+    margin: Optional[float] = None
+    premium_tier: Optional[str] = None
+    price_band: Optional[str] = None
+    aroma_fruit: Optional[float] = None
+    aroma_floral: Optional[float] = None
+    aroma_spice: Optional[float] = None
+    aroma_mineral: Optional[float] = None
+    aroma_acidity: Optional[float] = None
+    aroma_body: Optional[float] = None
+    aroma_tannin: Optional[float] = None
+    global_popularity_score: Optional[float] = None
+    season_tags: Optional[str] = None
+    is_active: Optional[bool] = True
+    is_archived: Optional[bool] = False
+    description: Optional[str] = None
+
+    @classmethod
+    def from_orm(cls, obj: Any) -> "ProductReadDC":
+        return cls(
+            id=obj.id,
+            tenant_id=obj.tenant_id,
+            product_key=obj.product_key,
+            name=obj.name,
+            family_crm=obj.family_crm,
+            sub_family=obj.sub_family,
+            cepage=obj.cepage,
+            sucrosite_niveau=obj.sucrosite_niveau,
+            price_ttc=obj.price_ttc,
+            margin=obj.margin,
+            premium_tier=obj.premium_tier,
+            price_band=obj.price_band,
+            aroma_fruit=obj.aroma_fruit,
+            aroma_floral=obj.aroma_floral,
+            aroma_spice=obj.aroma_spice,
+            aroma_mineral=obj.aroma_mineral,
+            aroma_acidity=obj.aroma_acidity,
+            aroma_body=obj.aroma_body,
+            aroma_tannin=obj.aroma_tannin,
+            global_popularity_score=obj.global_popularity_score,
+            season_tags=obj.season_tags,
+            is_active=obj.is_active,
+            is_archived=obj.is_archived,
+            description=obj.description,
+        )
+
+
+def _product_dc_to_dict(dc: ProductReadDC) -> dict[str, Any]:
+    out: dict[str, Any] = {"product_key": dc.product_key, "name": dc.name}
+    if dc.family_crm is not None:
+        out["family_crm"] = dc.family_crm
+    if dc.sub_family is not None:
+        out["sub_family"] = dc.sub_family
+    if dc.cepage is not None:
+        out["cepage"] = dc.cepage
+    if dc.sucrosite_niveau is not None:
+        out["sucrosite_niveau"] = dc.sucrosite_niveau
+    if dc.price_ttc is not None:
+        out["price_ttc"] = dc.price_ttc
+    if dc.margin is not None:
+        out["margin"] = dc.margin
+    if dc.premium_tier is not None:
+        out["premium_tier"] = dc.premium_tier
+    if dc.price_band is not None:
+        out["price_band"] = dc.price_band
+    if dc.aroma_fruit is not None:
+        out["aroma_fruit"] = dc.aroma_fruit
+    if dc.aroma_floral is not None:
+        out["aroma_floral"] = dc.aroma_floral
+    if dc.aroma_spice is not None:
+        out["aroma_spice"] = dc.aroma_spice
+    if dc.aroma_mineral is not None:
+        out["aroma_mineral"] = dc.aroma_mineral
+    if dc.aroma_acidity is not None:
+        out["aroma_acidity"] = dc.aroma_acidity
+    if dc.aroma_body is not None:
+        out["aroma_body"] = dc.aroma_body
+    if dc.aroma_tannin is not None:
+        out["aroma_tannin"] = dc.aroma_tannin
+    if dc.global_popularity_score is not None:
+        out["global_popularity_score"] = dc.global_popularity_score
+    if dc.season_tags is not None:
+        out["season_tags"] = dc.season_tags
+    if dc.is_active is not None:
+        out["is_active"] = dc.is_active
+    if dc.is_archived is not None:
+        out["is_archived"] = dc.is_archived
+    if dc.description is not None:
+        out["description"] = dc.description
+    out["tenant_id"] = dc.tenant_id
+    out["id"] = dc.id
+    return out
+
+
+@dataclass(slots=True)
+class SaleReadDC:
+    id: int
+    tenant_id: int
+    document_id: str
+    product_key: str
+    client_code: str
+    quantity: Optional[float] = None
+    amount: Optional[float] = None
+    sale_date: Optional[dt.datetime] = None
+
+    @classmethod
+    def from_orm(cls, obj: Any) -> "SaleReadDC":
+        return cls(
+            id=obj.id,
+            tenant_id=obj.tenant_id,
+            document_id=obj.document_id,
+            product_key=obj.product_key,
+            client_code=obj.client_code,
+            quantity=obj.quantity,
+            amount=obj.amount,
+            sale_date=obj.sale_date,
+        )
+
+
+def _sale_dc_to_dict(dc: SaleReadDC) -> dict[str, Any]:
+    out: dict[str, Any] = {
+        "document_id": dc.document_id,
+        "product_key": dc.product_key,
+        "client_code": dc.client_code,
+    }
+    if dc.quantity is not None:
+        out["quantity"] = dc.quantity
+    if dc.amount is not None:
+        out["amount"] = dc.amount
+    if dc.sale_date is not None:
+        out["sale_date"] = dc.sale_date
+    out["tenant_id"] = dc.tenant_id
+    out["id"] = dc.id
+    return out
+
+
+@dataclass(slots=True)
+class OrderItemReadDC:
+    id: int
+    order_id: int
+    product_id: int
+    tenant_id: int
+    quantity: Optional[float] = None
+    unit_price: Optional[float] = None
+    total_price: Optional[float] = None
+
+    @classmethod
+    def from_orm(cls, obj: Any) -> "OrderItemReadDC":
+        return cls(
+            id=obj.id,
+            order_id=obj.order_id,
+            product_id=obj.product_id,
+            tenant_id=obj.tenant_id,
+            quantity=obj.quantity,
+            unit_price=obj.unit_price,
+            total_price=obj.total_price,
+        )
+
+
+def _order_item_dc_to_dict(dc: OrderItemReadDC) -> dict[str, Any]:
+    out: dict[str, Any] = {"product_id": dc.product_id}
+    if dc.quantity is not None:
+        out["quantity"] = dc.quantity
+    if dc.unit_price is not None:
+        out["unit_price"] = dc.unit_price
+    if dc.total_price is not None:
+        out["total_price"] = dc.total_price
+    out["tenant_id"] = dc.tenant_id
+    out["id"] = dc.id
+    out["order_id"] = dc.order_id
+    return out
+
+
+class RecoItemRow(NamedTuple):
+    """Ligne ``RecoItem`` telle que lue par une requête de colonnes.
+
+    L'ordre des champs est celui des colonnes sélectionnées : les routes
+    construisent les lignes via ``RecoItemRow._make(row)``.
+    """
+
+    id: int
+    run_id: int
+    client_id: int
+    product_id: int
+    tenant_id: int
+    scenario: Optional[str] = None
+    rank: Optional[int] = None
+    score: Optional[float] = None
+    explain_short: Optional[str] = None
+    reasons_json: Optional[str] = None
+
+    @classmethod
+    def from_orm(cls, obj: Any) -> "RecoItemRow":
+        return cls(
+            obj.id,
+            obj.run_id,
+            obj.client_id,
+            obj.product_id,
+            obj.tenant_id,
+            obj.scenario,
+            obj.rank,
+            obj.score,
+            obj.explain_short,
+            obj.reasons_json,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        out: dict[str, Any] = {
+            "run_id": self.run_id,
+            "client_id": self.client_id,
+            "product_id": self.product_id,
+        }
+        if self.scenario is not None:
+            out["scenario"] = self.scenario
+        if self.rank is not None:
+            out["rank"] = self.rank
+        if self.score is not None:
+            out["score"] = self.score
+        if self.explain_short is not None:
+            out["explain_short"] = self.explain_short
+        if self.reasons_json is not None:
+            out["reasons_json"] = self.reasons_json
+        out["tenant_id"] = self.tenant_id
+        out["id"] = self.id
+        return out
+
+
+class ProductListRow(NamedTuple):
+    """Colonnes de ``Product`` lues pour la liste du catalogue."""
+
+    id: int
+    product_key: str
+    name: str
+    family_crm: Optional[str]
+    price_ttc: Optional[float]
+    price_band: Optional[str]
+    global_popularity_score: Optional[float]
+    is_active: Optional[bool]
     tenant_id: int
-    created_at: Optional[dt.datetime] = None
-    updated_at: Optional[dt.datetime] = None
 
-    class Config:
-        orm_mode = True
+    def to_dict(self) -> dict[str, Any]:
+        out: dict[str, Any] = {
+            "id": self.id,
+            "product_key": self.product_key,
+            "name": self.name,
+        }
+        if self.family_crm is not None:
+            out["family_crm"] = self.family_crm
+        if self.price_ttc is not None:
+            out["price_ttc"] = self.price_ttc
+        if self.price_band is not None:
+            out["price_band"] = self.price_band
+        if self.global_popularity_score is not None:
+            out["global_popularity_score"] = self.global_popularity_score
+        if self.is_active is not None:
+            out["is_active"] = self.is_active
+        out["tenant_id"] = self.tenant_id
+        return out
+
+
+def dump_clients(rows: Iterable[Any]) -> list[ClientReadDict]:
+    """Sérialise des ``Client`` ORM comme ``ClientRead`` (sans les ``None``)."""
+    from_orm, to_dict = ClientReadDC.from_orm, _client_dc_to_dict
+    return [to_dict(from_orm(r)) for r in rows]
+
+
+def dump_products(rows: Iterable[Any]) -> list[dict[str, Any]]:
+    """Sérialise des ``Product`` ORM comme ``ProductRead`` (sans les ``None``)."""
+    from_orm, to_dict = ProductReadDC.from_orm, _product_dc_to_dict
+    return [to_dict(from_orm(r)) for r in rows]
+
+
+def dump_product_list_rows(rows: Iterable[Any]) -> list[dict[str, Any]]:
+    """Sérialise des tuples ordonnés comme ``ProductListRow._fields`` (``ProductListRead``)."""
+    make = ProductListRow._make
+    return [make(r).to_dict() for r in rows]
+
+
+def dump_sales(rows: Iterable[Any]) -> list[dict[str, Any]]:
+    """Sérialise des ``Sale`` ORM comme ``SaleRead`` (sans les ``None``)."""
+    from_orm, to_dict = SaleReadDC.from_orm, _sale_dc_to_dict
+    return [to_dict(from_orm(r)) for r in rows]
+
+
+def dump_order_items(rows: Iterable[Any]) -> list[dict[str, Any]]:
+    """Sérialise des ``OrderItem`` ORM comme ``OrderItemRead`` (sans les ``None``)."""
+    from_orm, to_dict = OrderItemReadDC.from_orm, _order_item_dc_to_dict
+    return [to_dict(from_orm(r)) for r in rows]
+
+
+def dump_reco_items(rows: Iterable[Any]) -> list[dict[str, Any]]:
+    """Sérialise des ``RecoItem`` ORM comme ``RecoItemRead`` (sans les ``None``)."""
+    from_orm = RecoItemRow.from_orm
+    return [from_orm(r).to_dict() for r in rows]
+
+
+def dump_reco_item_rows(rows: Iterable[Any]) -> list[dict[str, Any]]:
+    """Sérialise des tuples de colonnes ordonnés comme ``RecoItemRow._fields``."""
+    make = RecoItemRow._make
+    return [make(r).to_dict() for r in rows]
+
+
+# ------------------ Adaptateurs de lots ------------------
+#
+# Validation d'une liste complète en un seul appel pydantic-core, plutôt
+# qu'un ``model_validate`` par ligne. Construits une fois à l'import : les
+# appelants les réutilisent au lieu d'instancier un TypeAdapter par requête.
+
+RecommendationsReadBatch = TypeAdapter(list[RecommendationRead])
+RecoRunsReadBatch = TypeAdapter(list[RecoRunRead])
+NextActionsReadBatch = TypeAdapter(list[NextActionOutputRead])
+AuditOutputsReadBatch = TypeAdapter(list[AuditOutputRead])
+
+
+def dump_json_list(adapter: TypeAdapter, rows: Iterable[Any]) -> bytes:
+    """Valide des objets ORM en un seul appel puis les sérialise en JSON (octets)."""
+    return adapter.dump_json(adapter.validate_python(list(rows), from_attributes=True))
+
+
+# Résumés de run stockés en JSON texte : décodés directement par
+# pydantic-core depuis la chaîne brute.
+RunSummaryJson = TypeAdapter(dict[str, Any])
+
+
+def parse_summary_json(raw: Optional[str | bytes]) -> dict[str, Any]:
+    """Décode ``RunSummary.summary_json`` ; vide ou invalide -> ``{}``."""
+    if not raw:
+        return {}
+    try:
+        return RunSummaryJson.validate_json(raw)
+    except Exception:
+        return {}
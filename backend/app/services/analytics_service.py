@@ -10,18 +10,169 @@ tableaux prêts à être affichés sur un tableau de bord.
 
 from __future__ import annotations
 
+import copy
 import datetime as dt
-from collections import defaultdict
-from typing import Dict, List, Any
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import pandas as pd
+from sqlalchemy import case, func, select, true
 from sqlalchemy.orm import Session
 
-from ..models import Client, Sale, Recommendation
+from ..models import AnalyticsOverview, Client, Sale, Recommendation
 
 
-def get_overview(db: Session, tenant_id: int) -> Dict[str, Any]:
+# ---------------------------------------------------------------------------
+# Cache des indicateurs
+#
+# Les tableaux de bord interrogent ces indicateurs en boucle alors que les
+# tables évoluent lentement. Les résultats sont conservés en mémoire
+# (processus) pendant ``_CACHE_TTL_SECONDS`` et indexés par une « version »
+# des données du tenant (max des identifiants ventes / clients /
+# recommandations) : toute insertion invalide naturellement l'entrée. Les
+# mises à jour en place (recalcul RFM, édition d'un client ou d'une vente)
+# appellent explicitement :func:`invalidate_cache`.
+#
+# Ce cache est propre à chaque processus : l'invalidation ne vide que celui
+# du processus appelant. Les autres workers (uvicorn, Celery) peuvent servir
+# leur entrée jusqu'à expiration, soit au plus ``_CACHE_TTL_SECONDS`` après
+# une mise à jour en place. L'instantané ``AnalyticsOverview``, lui, est
+# partagé par la base et supprimé dans la transaction de l'appelant.
+# ---------------------------------------------------------------------------
+
+_CACHE_TTL_SECONDS = 60.0
+_CACHE_MAXSIZE = 512
+_cache: "OrderedDict[Tuple[Any, ...], Tuple[float, Any]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def invalidate_cache(tenant_id: Optional[int] = None, db: Optional[Session] = None) -> None:
+    """Vide le cache analytique du processus (d'un tenant, ou entièrement).
+
+    Si ``db`` est fourni, la suppression de l'instantané
+    ``AnalyticsOverview`` correspondant est envoyée à la base (flush) ;
+    l'appelant la valide avec ses propres modifications (``db.commit()``).
+    """
+    with _cache_lock:
+        if tenant_id is None:
+            _cache.clear()
+        else:
+            for key in [k for k in _cache if k[1] == tenant_id]:
+                del _cache[key]
+    if db is not None:
+        snapshots = db.query(AnalyticsOverview)
+        if tenant_id is not None:
+            snapshots = snapshots.filter(AnalyticsOverview.tenant_id == tenant_id)
+        snapshots.delete(synchronize_session=False)
+        db.flush()
+
+
+def _data_version(db: Session, tenant_id: int) -> Tuple[Any, ...]:
+    """Sentinelle peu coûteuse : change dès qu'une ligne est ajoutée."""
+    return tuple(
+        db.execute(
+            select(
+                select(func.max(Sale.id)).where(Sale.tenant_id == tenant_id).scalar_subquery(),
+                select(func.max(Client.id)).where(Client.tenant_id == tenant_id).scalar_subquery(),
+                select(func.max(Recommendation.id))
+                .where(Recommendation.tenant_id == tenant_id)
+                .scalar_subquery(),
+            )
+        ).one()
+    )
+
+
+def _cached(
+    fn: Optional[Callable[..., Any]] = None, *, pass_version: bool = False
+) -> Callable[..., Any]:
+    """Met en cache le résultat par tenant et par version des données.
+
+    Avec ``pass_version=True``, la version calculée pour la clé est aussi
+    transmise à la fonction (argument ``data_version``) pour lui éviter de
+    la relire.
+    """
+    if fn is None:
+        return functools.partial(_cached, pass_version=pass_version)
+
+    @functools.wraps(fn)
+    def wrapper(db: Session, tenant_id: int, *args: Any, **kwargs: Any) -> Any:
+        bind = db.get_bind()
+        version = _data_version(db, tenant_id)
+        # L'identité du moteur distingue deux bases de même URL (tests)
+        key = (
+            fn.__name__,
+            tenant_id,
+            str(bind.url),
+            id(bind),
+            args,
+            tuple(sorted(kwargs.items())),
+            version,
+        )
+        now = time.monotonic()
+        with _cache_lock:
+            hit = _cache.get(key)
+            if hit is not None and now - hit[0] < _CACHE_TTL_SECONDS:
+                _cache.move_to_end(key)
+                return copy.deepcopy(hit[1])
+        if pass_version:
+            kwargs["data_version"] = version
+        result = fn(db, tenant_id, *args, **kwargs)
+        with _cache_lock:
+            _cache[key] = (now, copy.deepcopy(result))
+            _cache.move_to_end(key)
+            while len(_cache) > _CACHE_MAXSIZE:
+                _cache.popitem(last=False)
+        return result
+
+    return wrapper
+
+
+# Instantanés des indicateurs clés (table ``analytics_overview``), servis
+# tant qu'ils sont récents et que la version des données n'a pas changé.
+_SNAPSHOT_MAX_AGE = dt.timedelta(hours=1)
+_OVERVIEW_FIELDS = (
+    "total_clients",
+    "active_clients",
+    "churn_rate",
+    "total_revenue",
+    "average_order_value",
+    "recommendation_count",
+)
+
+
+def _version_token(version: Tuple[Any, ...]) -> str:
+    return ",".join(str(v) for v in version)
+
+
+def refresh_overview_snapshot(db: Session, tenant_id: int) -> Dict[str, Any]:
+    """Recalcule les indicateurs clés d'un tenant et met à jour l'instantané."""
+    version = _version_token(_data_version(db, tenant_id))
+    overview = _compute_overview(db, tenant_id)
+    snapshot = db.get(AnalyticsOverview, tenant_id)
+    if snapshot is None:
+        snapshot = AnalyticsOverview(tenant_id=tenant_id)
+        db.add(snapshot)
+    for name in _OVERVIEW_FIELDS:
+        setattr(snapshot, name, overview[name])
+    snapshot.data_version = version
+    snapshot.updated_at = dt.datetime.utcnow()
+    db.commit()
+    return overview
+
+
+@_cached(pass_version=True)
+def get_overview(
+    db: Session, tenant_id: int, data_version: Optional[Tuple[Any, ...]] = None
+) -> Dict[str, Any]:
     """Retourne des indicateurs clés pour un tenant.
 
+    Lit l'instantané ``AnalyticsOverview`` s'il est récent (moins de
+    ``_SNAPSHOT_MAX_AGE``) et calculé sur la même version des données ;
+    sinon les indicateurs sont recalculés à la volée.
+
     Les métriques incluent :
     * ``total_clients`` : nombre total de clients
     * ``active_clients`` : clients ayant acheté au moins une fois dans les 90 derniers jours
@@ -29,32 +180,67 @@ def get_overview(db: Session, tenant_id: int) -> Dict[str, Any]:
     * ``total_revenue`` : somme des montants de ventes
     * ``average_order_value`` : moyenne des paniers (sur les commandes distinctes)
     * ``recommendation_count`` : nombre de recommandations générées
+
+    ``data_version`` est fourni par ``_cached`` (même lecture que la clé de
+    cache) ; il n'est relu que si la fonction est appelée sans lui.
     """
+    snapshot = db.get(AnalyticsOverview, tenant_id)
+    if (
+        snapshot is not None
+        and snapshot.updated_at is not None
+        and snapshot.updated_at >= dt.datetime.utcnow() - _SNAPSHOT_MAX_AGE
+    ):
+        if data_version is None:
+            data_version = _data_version(db, tenant_id)
+        if snapshot.data_version == _version_token(data_version):
+            return {name: getattr(snapshot, name) for name in _OVERVIEW_FIELDS}
+    return _compute_overview(db, tenant_id)
+
+
+def _compute_overview(db: Session, tenant_id: int) -> Dict[str, Any]:
     now = dt.datetime.utcnow()
-    clients = db.query(Client).filter(Client.tenant_id == tenant_id).all()
-    total_clients = len(clients)
-    # Calculer l'inactivité et l'activité
-    active_clients = 0
-    inactive_clients = 0
-    for c in clients:
-        if c.last_purchase_date:
-            days_since = (now - c.last_purchase_date).days
-            if days_since <= 90:
-                active_clients += 1
-            if days_since > 180:
-                inactive_clients += 1
+    # Seuils équivalents à ``(now - last_purchase_date).days`` <= 90 / > 180
+    active_since = now - dt.timedelta(days=91)
+    inactive_before = now - dt.timedelta(days=181)
+    # Les trois agrégats (clients, ventes, recommandations) sont regroupés
+    # dans une seule requête : chaque sous-requête renvoie une ligne.
+    clients_agg = (
+        select(
+            func.count(Client.id).label("total_clients"),
+            func.sum(case((Client.last_purchase_date > active_since, 1), else_=0)).label("active_clients"),
+            func.sum(case((Client.last_purchase_date <= inactive_before, 1), else_=0)).label("inactive_clients"),
+        )
+        .where(Client.tenant_id == tenant_id)
+        .subquery("c")
+    )
+    # Panier moyen par commande : chaque document_id correspond à une commande,
+    # les ventes sans document_id formant une commande à part entière.
+    sales_agg = (
+        select(
+            func.coalesce(func.sum(Sale.amount), 0.0).label("total_revenue"),
+            func.count(func.distinct(Sale.document_id)).label("distinct_documents"),
+            func.max(case((Sale.document_id.is_(None), 1), else_=0)).label("has_undocumented"),
+        )
+        .where(Sale.tenant_id == tenant_id)
+        .subquery("s")
+    )
+    reco_count_q = (
+        select(func.count(Recommendation.id))
+        .where(Recommendation.tenant_id == tenant_id)
+        .scalar_subquery()
+    )
+    row = db.execute(
+        select(clients_agg, sales_agg, reco_count_q.label("reco_count"))
+        .select_from(clients_agg.join(sales_agg, true()))
+    ).one()
+    total_clients = row.total_clients
+    active_clients = row.active_clients or 0
+    inactive_clients = row.inactive_clients or 0
     churn_rate = inactive_clients / total_clients if total_clients > 0 else 0.0
-    # Calculer revenu total et AOV
-    sales = db.query(Sale).filter(Sale.tenant_id == tenant_id).all()
-    total_revenue = sum(s.amount or 0.0 for s in sales)
-    # Panier moyen par commande
-    # On considère que chaque document_id correspond à une commande
-    orders = defaultdict(float)
-    for s in sales:
-        orders[s.document_id] += s.amount or 0.0
-    aov = (sum(orders.values()) / len(orders)) if orders else 0.0
-    # Recommandations
-    reco_count = db.query(Recommendation).filter(Recommendation.tenant_id == tenant_id).count()
+    total_revenue = float(row.total_revenue)
+    n_orders = row.distinct_documents + (row.has_undocumented or 0)
+    aov = (total_revenue / n_orders) if n_orders else 0.0
+    reco_count = row.reco_count
     return {
         "total_clients": total_clients,
         "active_clients": active_clients,
@@ -65,25 +251,24 @@ def get_overview(db: Session, tenant_id: int) -> Dict[str, Any]:
     }
 
 
+@_cached
 def get_segment_distribution(db: Session, tenant_id: int) -> Dict[str, int]:
     """Retourne la distribution des segments RFM pour un tenant.
 
     Renvoie un dict ``segment -> count``.
     """
-    result: Dict[str, int] = defaultdict(int)
+    # Segments vides ou absents regroupés sous « Unknown », comptés par la base.
+    segment = func.coalesce(func.nullif(Client.rfm_segment, ""), "Unknown")
     rows = (
-        db.query(Client.rfm_segment)
+        db.query(segment, func.count())
         .filter(Client.tenant_id == tenant_id)
+        .group_by(segment)
         .all()
     )
-    for (segment,) in rows:
-        if segment:
-            result[segment] += 1
-        else:
-            result["Unknown"] += 1
-    return dict(result)
+    return {name: count for name, count in rows}
 
 
+@_cached
 def get_sales_trend(db: Session, tenant_id: int, period: str = "month") -> List[Dict[str, Any]]:
     """Retourne une série temporelle des ventes pour un tenant.
 
@@ -97,21 +282,64 @@ def get_sales_trend(db: Session, tenant_id: int, period: str = "month") -> List[
     """
     if period not in {"month", "week"}:
         raise ValueError("period must be 'month' or 'week'")
-    sales = db.query(Sale).filter(Sale.tenant_id == tenant_id).all()
-    trend: Dict[str, float] = defaultdict(float)
-    for sale in sales:
-        if not sale.sale_date:
-            continue
-        date = sale.sale_date
-        if period == "month":
-            key = f"{date.year}-{date.month:02d}"
-        else:
-            # ISO week number
-            key = f"{date.isocalendar().year}-{date.isocalendar().week:02d}"
-        trend[key] += sale.amount or 0.0
-    # Trier par période
-    sorted_keys = sorted(trend.keys())
-    return [{"period": k, "revenue": trend[k]} for k in sorted_keys]
+    key = _period_key(db, period)
+    if key is None:
+        return _sales_trend_python(db, tenant_id, period)
+    rows = (
+        db.query(key.label("period"), func.coalesce(func.sum(Sale.amount), 0.0))
+        .filter(Sale.tenant_id == tenant_id, Sale.sale_date.isnot(None))
+        .group_by("period")
+        .order_by("period")
+        .all()
+    )
+    return [{"period": k, "revenue": float(revenue)} for k, revenue in rows]
+
+
+def _period_key(db: Session, period: str):
+    """Expression SQL ``YYYY-MM`` / ``YYYY-WW`` (semaine ISO) selon le dialecte.
+
+    Renvoie ``None`` si le dialecte ne sait pas calculer la clé (semaine ISO
+    sous SQLite) : le regroupement est alors fait en Python.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return func.to_char(Sale.sale_date, "YYYY-MM" if period == "month" else "IYYY-IW")
+    if dialect == "sqlite" and period == "month":
+        return func.strftime("%Y-%m", Sale.sale_date)
+    return None
+
+
+def _sales_trend_python(db: Session, tenant_id: int, period: str) -> List[Dict[str, Any]]:
+    # SQLite sait au moins regrouper par jour : on ne rapatrie alors qu'une
+    # ligne par date, les semaines ISO étant calculées ensuite en Python.
+    if db.get_bind().dialect.name == "sqlite":
+        day = func.date(Sale.sale_date)
+        sales = (
+            db.query(day, func.sum(Sale.amount))
+            .filter(Sale.tenant_id == tenant_id, Sale.sale_date.isnot(None))
+            .group_by(day)
+            .yield_per(5000)
+        )
+    else:
+        # Tuples de colonnes lus par lots, regroupés de façon vectorisée
+        sales = (
+            db.query(Sale.sale_date, Sale.amount)
+            .filter(Sale.tenant_id == tenant_id, Sale.sale_date.isnot(None))
+            .yield_per(5000)
+        )
+    df = pd.DataFrame.from_records(iter(sales), columns=["sale_date", "amount"])
+    if df.empty:
+        return []
+    dates = pd.to_datetime(df["sale_date"])
+    if period == "month":
+        keys = dates.dt.strftime("%Y-%m")
+    else:
+        # ISO week number
+        iso = dates.dt.isocalendar()
+        keys = iso["year"].astype(str) + "-" + iso["week"].astype(str).str.zfill(2)
+    amounts = pd.to_numeric(df["amount"], errors="coerce").fillna(0.0)
+    trend = amounts.groupby(keys).sum().sort_index()
+    return [{"period": k, "revenue": float(v)} for k, v in trend.items()]
 
 
 def get_outcomes_overview(db: Session, tenant_id: int) -> Dict[str, Any]:
@@ -135,26 +363,19 @@ def get_outcomes_overview(db: Session, tenant_id: int) -> Dict[str, Any]:
     # Compter les événements marketing
     from ..models import ContactEvent
 
-    delivered_count = (
-        db.query(ContactEvent)
-        .filter(ContactEvent.tenant_id == tenant_id, ContactEvent.status == "delivered")
-        .count()
-    )
-    opened_count = (
-        db.query(ContactEvent)
-        .filter(ContactEvent.tenant_id == tenant_id, ContactEvent.status == "open")
-        .count()
-    )
-    clicked_count = (
-        db.query(ContactEvent)
-        .filter(ContactEvent.tenant_id == tenant_id, ContactEvent.status == "click")
-        .count()
-    )
-    unsub_count = (
-        db.query(ContactEvent)
-        .filter(ContactEvent.tenant_id == tenant_id, ContactEvent.status == "unsubscribe")
-        .count()
+    counts = dict(
+        db.query(ContactEvent.status, func.count(ContactEvent.id))
+        .filter(
+            ContactEvent.tenant_id == tenant_id,
+            ContactEvent.status.in_(("delivered", "open", "click", "unsubscribe")),
+        )
+        .group_by(ContactEvent.status)
+        .all()
     )
+    delivered_count = counts.get("delivered", 0)
+    opened_count = counts.get("open", 0)
+    clicked_count = counts.get("click", 0)
+    unsub_count = counts.get("unsubscribe", 0)
 
     # Calculer les taux d'ouverture, de clic et de désabonnement
     open_rate = opened_count / delivered_count if delivered_count > 0 else 0.0
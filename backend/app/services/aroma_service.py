@@ -17,10 +17,11 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Dict, Tuple, List
 
+import numpy as np
+import orjson
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
-from ..models import Client, Product, Order, OrderItem
+from ..models import AROMA_AXES, Client, Order, OrderItem, Product
 
 
 @dataclass
@@ -31,6 +32,50 @@ class AromaProfile:
     level: str
 
 
+# Colonnes produit dans l'ordre ``AROMA_AXES``
+_AROMA_COLUMNS = tuple(getattr(Product, f"aroma_{axis}") for axis in AROMA_AXES)
+
+
+def _build_profiles(
+    aggregates: np.ndarray, total_weights: np.ndarray, n_orders: np.ndarray
+) -> List[AromaProfile]:
+    """Build one profile per row from weighted sums of product vectors (k, 7)."""
+    # Normalize by total weight and divide by 5 to scale 0..1
+    all_axes: List[Dict[str, float]] = []
+    for aggregate, total_weight in zip(aggregates.tolist(), total_weights.tolist()):
+        if total_weight > 0:
+            all_axes.append({
+                axis: round((value / total_weight) / 5.0, 3)
+                for axis, value in zip(AROMA_AXES, aggregate)
+            })
+        else:
+            all_axes.append(dict.fromkeys(AROMA_AXES, 0.0))
+
+    # Compute confidence (heuristic: number of orders + variance) for all
+    # rows at once. Simplified variance: average absolute deviation from mean
+    values = np.array([list(axes.values()) for axes in all_axes], dtype=np.float64)
+    values = values.reshape(-1, len(AROMA_AXES))
+    variance = np.abs(values - values.mean(axis=1, keepdims=True)).mean(axis=1)
+    stability = 1.0 - variance  # 0 unstable -> 1 stable
+    volume_factor = np.minimum(1.0, np.asarray(n_orders, dtype=np.float64) / 10.0)
+    scores = (0.2 + 0.8 * volume_factor * stability).tolist()
+
+    profiles: List[AromaProfile] = []
+    for axes_norm, score in zip(all_axes, scores):
+        # Determine top 3 axes
+        top_axes = sorted(axes_norm.items(), key=lambda x: x[1], reverse=True)[:3]
+        confidence = round(score, 3)
+        level = "Low"
+        if confidence >= 0.7:
+            level = "High"
+        elif confidence >= 0.45:
+            level = "Medium"
+        profiles.append(
+            AromaProfile(axes=axes_norm, top_axes=top_axes, confidence=confidence, level=level)
+        )
+    return profiles
+
+
 class AromaService:
     def __init__(self, db: Session):
         self.db = db
@@ -44,81 +89,34 @@ class AromaService:
         Returns:
             AromaProfile dataclass with axes and confidence
         """
-        # Fetch order items for client
-        items = (
-            self.db.query(OrderItem)
-            .join(Order)
+        # Fetch order item columns for client: (order_id, total_price, 7 axes)
+        rows = (
+            self.db.query(OrderItem.order_id, OrderItem.total_price, *_AROMA_COLUMNS)
+            .join(Order, OrderItem.order_id == Order.id)
+            .join(Product, OrderItem.product_id == Product.id)
             .filter(Order.client_id == client_id)
             .all()
         )
-        if not items:
+        if not rows:
             return AromaProfile(axes={}, top_axes=[], confidence=0.0, level="Low")
 
-        # Aggregate weighted product vectors
-        total_weight = 0.0
-        aggregate: Dict[str, float] = {
-            "fruit": 0.0,
-            "floral": 0.0,
-            "spice": 0.0,
-            "mineral": 0.0,
-            "acidity": 0.0,
-            "body": 0.0,
-            "tannin": 0.0,
-        }
-        for item in items:
-            product: Product = item.product
-            weight = item.total_price or 0.0
-            total_weight += weight
-            # Sum weighted intensities; missing values contribute 0
-            aggregate["fruit"] += (product.aroma_fruit or 0) * weight
-            aggregate["floral"] += (product.aroma_floral or 0) * weight
-            aggregate["spice"] += (product.aroma_spice or 0) * weight
-            aggregate["mineral"] += (product.aroma_mineral or 0) * weight
-            aggregate["acidity"] += (product.aroma_acidity or 0) * weight
-            aggregate["body"] += (product.aroma_body or 0) * weight
-            aggregate["tannin"] += (product.aroma_tannin or 0) * weight
-
-        # Normalize by total weight and divide by 5 to scale 0..1
-        axes_norm: Dict[str, float] = {}
-        for axis, value in aggregate.items():
-            if total_weight > 0:
-                axes_norm[axis] = round((value / total_weight) / 5.0, 3)
-            else:
-                axes_norm[axis] = 0.0
-
-        # Determine top 3 axes
-        sorted_axes = sorted(axes_norm.items(), key=lambda x: x[1], reverse=True)
-        top_axes = sorted_axes[:3]
-
-        # Compute confidence (heuristic: number of orders + variance)
-        n_orders = (
-            self.db.query(func.count(Order.id))
-            .filter(Order.client_id == client_id)
-            .scalar()
-        ) or 0
-        # Simplified variance: average absolute deviation from mean
-        values = [v for _, v in axes_norm.items()]
-        mean_val = sum(values) / len(values)
-        variance = sum(abs(v - mean_val) for v in values) / len(values)
-        stability = 1.0 - variance  # 0 unstable -> 1 stable
-        volume_factor = min(1.0, (n_orders / 10.0))
-        confidence = round(0.2 + 0.8 * volume_factor * stability, 3)
-        level = "Low"
-        if confidence >= 0.7:
-            level = "High"
-        elif confidence >= 0.45:
-            level = "Medium"
-
-        return AromaProfile(axes=axes_norm, top_axes=top_axes, confidence=confidence, level=level)
+        # Aggregate weighted product vectors: (n, 7) matrix of intensities,
+        # missing values (None -> NaN) contribute 0
+        data = np.nan_to_num(np.array(rows, dtype=np.float64))
+        weights = data[:, 1]
+        n_orders = len(np.unique(data[:, 0]))
+        return _build_profiles(
+            (weights @ data[:, 2:])[None, :], np.array([weights.sum()]), np.array([n_orders])
+        )[0]
 
     def compute_client_aroma_profiles(self, tenant_id: int) -> int:
         """Calcule et stocke les profils aromatiques pour tous les clients d'un tenant.
 
-        Cette méthode itère sur l'ensemble des clients du tenant donné,
-        calcule leur profil aromatique (axes, top_axes, niveau de confiance)
-        via ``compute_for_client`` et sérialise le résultat dans le champ
-        ``Client.aroma_profile`` (au format JSON). Elle retourne le nombre
-        de clients mis à jour.
+        Cette méthode charge en une requête les lignes de commande de tout
+        le tenant, calcule le profil aromatique de chaque client (axes,
+        top_axes, niveau de confiance, comme ``compute_for_client``) et
+        sérialise le résultat dans le champ ``Client.aroma_profile`` (au
+        format JSON). Elle retourne le nombre de clients mis à jour.
 
         Args:
             tenant_id: identifiant du locataire
@@ -126,21 +124,55 @@ class AromaService:
         Returns:
             nombre de clients pour lesquels le profil a été calculé
         """
-        import json
-
-        count = 0
-        # Récupérer les clients du tenant
-        clients = self.db.query(Client).filter(Client.tenant_id == tenant_id).all()
-        for client in clients:
-            profile = self.compute_for_client(client.id)
+        # Toutes les lignes de commande du tenant en une seule requête
+        # (colonnes brutes, pas d'objets ORM), agrégées ensuite par client.
+        rows = (
+            self.db.query(
+                Order.client_id,
+                OrderItem.order_id,
+                OrderItem.total_price,
+                *_AROMA_COLUMNS,
+            )
+            .join(OrderItem, OrderItem.order_id == Order.id)
+            .join(Product, OrderItem.product_id == Product.id)
+            .join(Client, Client.id == Order.client_id)
+            .filter(Client.tenant_id == tenant_id)
+            .yield_per(5000)
+        )
+        data = np.array(list(rows), dtype=np.float64).reshape(-1, 3 + len(AROMA_AXES))
+        # None -> NaN à la conversion, puis 0 (valeur aromatique manquante)
+        data = np.nan_to_num(data)
+        client_ids, client_idx = np.unique(data[:, 0].astype(np.int64), return_inverse=True)
+        weights = data[:, 2]
+        aggregates = np.zeros((len(client_ids), len(AROMA_AXES)))
+        np.add.at(aggregates, client_idx, weights[:, None] * data[:, 3:])
+        total_weights = np.bincount(client_idx, weights=weights, minlength=len(client_ids))
+        order_pairs = np.unique(data[:, :2], axis=0)
+        n_orders = np.bincount(
+            np.searchsorted(client_ids, order_pairs[:, 0].astype(np.int64)),
+            minlength=len(client_ids),
+        )
+        profiles = dict(zip(
+            client_ids.tolist(), _build_profiles(aggregates, total_weights, n_orders)
+        ))
+        empty = AromaProfile(axes={}, top_axes=[], confidence=0.0, level="Low")
+
+        # Récupérer les identifiants des clients du tenant
+        client_rows = self.db.query(Client.id).filter(Client.tenant_id == tenant_id).all()
+        payloads = []
+        for (client_id,) in client_rows:
+            profile = profiles.get(client_id, empty)
             # Sérialiser le profil complet (axes, top_axes, confidence, level)
-            client.aroma_profile = json.dumps({
-                "axes": profile.axes,
-                "top_axes": profile.top_axes,
-                "confidence": profile.confidence,
-                "level": profile.level,
+            payloads.append({
+                "id": client_id,
+                "aroma_profile": orjson.dumps({
+                    "axes": profile.axes,
+                    "top_axes": profile.top_axes,
+                    "confidence": profile.confidence,
+                    "level": profile.level,
+                }).decode(),
             })
-            count += 1
-        # Commit en bloc pour toutes les mises à jour
+        # Mise à jour groupée (UPDATE exécutés en lot) puis commit unique
+        self.db.bulk_update_mappings(Client, payloads)
         self.db.commit()
-        return count
\ No newline at end of file
+        return len(payloads)
\ No newline at end of file
@@ -11,26 +11,32 @@ from ..models import Client, ContactEvent, Product, Sale
 AuditIssue = Dict[str, Any]
 
 
-def _avg_purchase_price(purchases: List[Sale], product_map: Dict[str, Product]) -> float:
-    prices: List[float] = []
-    for sale in purchases:
-        prod = product_map.get(sale.product_key)
-        if prod and prod.price_ttc:
-            prices.append(prod.price_ttc)
-    if not prices:
-        return 0.0
-    return sum(prices) / len(prices)
+def _purchase_profile(
+    purchases: List[Sale], product_map: Dict[str, Product]
+) -> Tuple[set, float, str | None]:
+    """Clés achetées, prix moyen et sucrosité dominante, en un seul passage.
 
-
-def _dominant_sugar(purchases: List[Sale], product_map: Dict[str, Product]) -> str | None:
-    sugars: List[str] = []
+    Le niveau de sucrosité dominant est le premier rencontré parmi les plus
+    fréquents (comme ``Counter.most_common``).
+    """
+    purchased_keys = set()
+    price_total = 0.0
+    price_count = 0
+    sugar_tally: Dict[str, int] = {}
     for sale in purchases:
+        purchased_keys.add(sale.product_key)
         prod = product_map.get(sale.product_key)
-        if prod and prod.sucrosite_niveau:
-            sugars.append(prod.sucrosite_niveau.lower())
-    if not sugars:
-        return None
-    return Counter(sugars).most_common(1)[0][0]
+        if not prod:
+            continue
+        if prod.price_ttc:
+            price_total += prod.price_ttc
+            price_count += 1
+        if prod.sucrosite_niveau:
+            sugar = prod.sucrosite_niveau.lower()
+            sugar_tally[sugar] = sugar_tally.get(sugar, 0) + 1
+    avg_price = price_total / price_count if price_count else 0.0
+    dominant_sugar = max(sugar_tally, key=sugar_tally.__getitem__) if sugar_tally else None
+    return purchased_keys, avg_price, dominant_sugar
 
 
 def audit_client(
@@ -82,64 +88,87 @@ def audit_client(
     if client.email_opt_out:
         add_issue("ERROR", "OPTOUT_OR_BOUNCE", {"message": "Client opt-out"})
 
+    # Un seul passage sur les événements de contact
+    bounce_status = None
+    recent_contact = None
     for ev in contact_events:
-        if ev.status and ev.status.lower() in {"bounce", "unsubscribe"}:
-            add_issue("ERROR", "OPTOUT_OR_BOUNCE", {"status": ev.status})
+        if bounce_status is None and ev.status and ev.status.lower() in {"bounce", "unsubscribe"}:
+            bounce_status = ev.status
+        if (
+            recent_contact is None
+            and ev.contact_date
+            and (now - ev.contact_date).days < silence_window_days
+        ):
+            recent_contact = ev.contact_date
+        if bounce_status is not None and recent_contact is not None:
             break
-
-    for ev in contact_events:
-        if ev.contact_date and (now - ev.contact_date).days < silence_window_days:
-            add_issue("ERROR", "SILENCE_WINDOW", {"contact_date": ev.contact_date.isoformat()})
-            break
-
-    # Duplicates dans les recommandations
-    prod_counts = Counter([r.get("product_key") for r in recos if r.get("product_key")])
-    dupes = [k for k, v in prod_counts.items() if v > 1]
-    if dupes:
-        add_issue("ERROR", "RECENT_DUPLICATE", {"products": dupes})
-
-    purchased_keys = {s.product_key for s in purchases}
-    avg_price = _avg_purchase_price(purchases, product_map)
-
+    if bounce_status is not None:
+        add_issue("ERROR", "OPTOUT_OR_BOUNCE", {"status": bounce_status})
+    if recent_contact is not None:
+        add_issue("ERROR", "SILENCE_WINDOW", {"contact_date": recent_contact.isoformat()})
+
+    purchased_keys, avg_price, dominant_sugar = _purchase_profile(purchases, product_map)
+
+    # Un seul passage sur les recommandations : doublons, règles de scénario,
+    # familles et sucrosité. Les anomalies sont ensuite ajoutées dans l'ordre
+    # des règles.
+    prod_counts: Counter = Counter()
+    fam_counter: Counter = Counter()
+    scenario_issues: List[Tuple[str, str, Dict[str, Any]]] = []
+    sugar_mismatch = None
     for reco in recos:
-        scen = (reco.get("scenario") or "").lower()
-        prod = product_map.get(reco.get("product_key"))
+        product_key = reco.get("product_key")
+        if product_key:
+            prod_counts[product_key] += 1
+        prod = product_map.get(product_key)
         if not prod:
             continue
+        if prod.family_crm:
+            fam_counter[prod.family_crm] += 1
+        scen = (reco.get("scenario") or "").lower()
         if scen == "upsell" and prod.price_ttc is not None and prod.price_ttc <= avg_price:
-            add_issue(
-                "ERROR",
-                "UPSELL_NOT_HIGHER",
-                {"product_key": prod.product_key, "price": prod.price_ttc, "avg_price": avg_price},
+            scenario_issues.append(
+                (
+                    "ERROR",
+                    "UPSELL_NOT_HIGHER",
+                    {"product_key": prod.product_key, "price": prod.price_ttc, "avg_price": avg_price},
+                )
             )
         if scen == "cross_sell" and prod.product_key in purchased_keys:
-            add_issue("WARN", "CROSS_SELL_NOT_NEW", {"product_key": prod.product_key})
+            scenario_issues.append(("WARN", "CROSS_SELL_NOT_NEW", {"product_key": prod.product_key}))
+        if (
+            sugar_mismatch is None
+            and dominant_sugar
+            and prod.sucrosite_niveau
+            and prod.sucrosite_niveau.lower() != dominant_sugar
+        ):
+            sugar_mismatch = prod
+
+    # Duplicates dans les recommandations
+    dupes = [k for k, v in prod_counts.items() if v > 1]
+    if dupes:
+        add_issue("ERROR", "RECENT_DUPLICATE", {"products": dupes})
+
+    for severity, rule, details in scenario_issues:
+        add_issue(severity, rule, details)
 
     # Diversité
-    families = [product_map[r["product_key"]].family_crm for r in recos if r.get("product_key") in product_map]
-    fam_counter = Counter([f for f in families if f])
     if recos and fam_counter:
         top_family, top_count = fam_counter.most_common(1)[0]
         if top_count / max(1, len(recos)) > 0.7 and len(recos) >= 3:
             add_issue("WARN", "LOW_DIVERSITY", {"family": top_family, "share": top_count / len(recos)})
 
     # Sucrosité
-    dominant_sugar = _dominant_sugar(purchases, product_map)
-    if dominant_sugar:
-        for reco in recos:
-            prod = product_map.get(reco.get("product_key"))
-            if prod and prod.sucrosite_niveau:
-                if prod.sucrosite_niveau.lower() != dominant_sugar:
-                    add_issue(
-                        "WARN",
-                        "SUGAR_MISMATCH",
-                        {
-                            "product_key": prod.product_key,
-                            "suggested": prod.sucrosite_niveau,
-                            "preferred": dominant_sugar,
-                        },
-                    )
-                    break
+    if sugar_mismatch is not None:
+        add_issue(
+            "WARN",
+            "SUGAR_MISMATCH",
+            {
+                "product_key": sugar_mismatch.product_key,
+                "suggested": sugar_mismatch.sucrosite_niveau,
+                "preferred": dominant_sugar,
+            },
+        )
 
     audit_score = max(0.0, 100.0 - 40 * errors - 10 * warns)
     eligible = errors == 0 and audit_score >= 80
@@ -15,9 +15,9 @@ Un lot passe l'audit si ``erreurs == 0`` et ``score >= 80``.
 from __future__ import annotations
 
 import datetime as dt
-from collections import defaultdict
 from typing import Dict
 
+from sqlalchemy import case, exists, func, or_
 from sqlalchemy.orm import Session
 
 from ..models import Client, Sale, AuditLog, Product
@@ -43,7 +43,8 @@ def run_audit(db: Session, tenant_id: int) -> AuditLog:
     6. **INVALID_SALE_VALUE** (Error) : vente avec quantité ou montant négatif ou nul.
     7. **UNKNOWN_PRODUCT** (Error) : vente référencée avec une clé produit inconnue dans le catalogue.
     8. **UNKNOWN_CLIENT** (Error) : vente avec un code client inconnu.
-    9. **CHURN_WARNING** (Warning) : client sans achat depuis plus de 180 jours.
+    9. **CHURN_WARNING** (Warning) : client sans achat depuis plus de 180 jours
+       (non émis lorsque SILENCE_WINDOW s'applique déjà).
     10. **UNREALISTIC_PRICE** (Warning) : produit avec un prix négatif ou excessif (> 1000).
     11. **NEGATIVE_MARGIN** (Error) : produit avec une marge négative.
     12. **INCOMPLETE_RFM** (Warning) : client sans composante RFM (recency, frequency ou monetary).
@@ -55,139 +56,230 @@ def run_audit(db: Session, tenant_id: int) -> AuditLog:
     warnings = 0
     details = []
     now = dt.datetime.utcnow()
-    # Charger toutes les entités nécessaires
-    clients = db.query(Client).filter(Client.tenant_id == tenant_id).all()
-    products = db.query(Product).filter(Product.tenant_id == tenant_id).all()
-    # Create product key set and client code set for quick lookup
-    product_keys = {p.product_key for p in products if p.product_key}
-    client_codes = {c.client_code for c in clients if c.client_code}
-    # Map email to list of clients
-    email_map: Dict[str, list] = {}
-    for c in clients:
-        email = c.email or ""
-        if email:
-            email_map.setdefault(email.lower(), []).append(c)
-    # Compute recency for churn check (R9) and maintain last_purchase_date presence
-    for c in clients:
-        # R1: Silence window (no purchase > 365 days)
-        if c.last_purchase_date:
-            if (now - c.last_purchase_date).days > 365:
+    # Seuils équivalents à ``(now - last_purchase_date).days`` > 365 / > 180
+    silence_before = now - dt.timedelta(days=366)
+    churn_before = now - dt.timedelta(days=181)
+    # Tenant sans aucune donnée : aucune règle ne peut se déclencher
+    has_data = db.query(
+        or_(
+            exists().where(Client.tenant_id == tenant_id),
+            exists().where(Product.tenant_id == tenant_id),
+            exists().where(Sale.tenant_id == tenant_id),
+        )
+    ).scalar()
+    if not has_data:
+        return _save_log(db, tenant_id, now, errors, warnings, details)
+    # Charger uniquement les colonnes utilisées par les règles, par ordre
+    # d'identifiant (l'index tenant/date ne doit pas dicter l'ordre des messages)
+    clients = (
+        db.query(
+            Client.client_code,
+            Client.email,
+            Client.last_purchase_date,
+            Client.recency,
+            Client.frequency,
+            Client.monetary,
+        )
+        .filter(Client.tenant_id == tenant_id)
+        .order_by(Client.id)
+        .all()
+    )
+    products = (
+        db.query(Product.product_key, Product.price_ttc, Product.margin, Product.family_crm)
+        .filter(Product.tenant_id == tenant_id)
+        .order_by(Product.id)
+        .all()
+    )
+    # R4: Low diversity per client : codes client n'ayant acheté qu'un seul
+    # produit distinct (une clé produit absente compte comme un produit)
+    n_products = func.count(func.distinct(Sale.product_key)) + func.max(
+        case((Sale.product_key.is_(None), 1), else_=0)
+    )
+    single_product_codes = {
+        code
+        for (code,) in db.query(Sale.client_code)
+        .filter(Sale.tenant_id == tenant_id)
+        .group_by(Sale.client_code)
+        .having(n_products == 1)
+    }
+    # Un seul passage sur les clients : règles R1/R2/R9/R12, regroupement
+    # des e‑mails (R5) et messages R4 (ajoutés après R3 pour garder l'ordre)
+    low_diversity = []
+    duplicates: Dict[str, list] = {}
+    for code, email, last_purchase, recency, frequency, monetary in clients:
+        if last_purchase:
+            # R1: Silence window (no purchase > 365 days)
+            if last_purchase <= silence_before:
                 errors += 1
                 details.append(
-                    f"SILENCE_WINDOW: Client {c.client_code} inactif depuis plus de 365 jours"
+                    f"SILENCE_WINDOW: Client {code} inactif depuis plus de 365 jours"
                 )
         else:
             # Pas de date d'achat connue
             errors += 1
-            details.append(f"NO_PURCHASE_DATA: Client {c.client_code} n'a aucune date d'achat")
+            details.append(f"NO_PURCHASE_DATA: Client {code} n'a aucune date d'achat")
         # R2: Missing email
-        if not c.email:
+        if not email:
             errors += 1
-            details.append(f"MISSING_EMAIL: Client {c.client_code} sans e‑mail")
-        # R9: Churn warning (no purchase in 180 days)
-        if c.last_purchase_date:
-            if (now - c.last_purchase_date).days > 180:
-                warnings += 1
-                details.append(
-                    f"CHURN_WARNING: Client {c.client_code} n'a pas acheté depuis plus de 180 jours"
-                )
-        # R12: Incomplete RFM (recency, frequency, monetary)
-        if not c.recency or not c.frequency or not c.monetary:
+            details.append(f"MISSING_EMAIL: Client {code} sans e‑mail")
+        # R9: Churn warning (no purchase in 180 days), sauf si R1 s'applique
+        if last_purchase and silence_before < last_purchase <= churn_before:
             warnings += 1
             details.append(
-                f"INCOMPLETE_RFM: Client {c.client_code} a des composantes RFM manquantes"
+                f"CHURN_WARNING: Client {code} n'a pas acheté depuis plus de 180 jours"
             )
-    # R5: Duplicate email
-    for email, clts in email_map.items():
-        if len(clts) > 1:
+        # R12: Incomplete RFM (recency, frequency, monetary)
+        if not recency or not frequency or not monetary:
             warnings += 1
-            codes = ", ".join([cl.client_code for cl in clts])
-            details.append(f"DUPLICATE_EMAIL: L'e‑mail {email} est utilisé par plusieurs clients ({codes})")
-    # Charger toutes les ventes
-    sales = db.query(Sale).filter(Sale.tenant_id == tenant_id).all()
-    # R3: Recent duplicate (30 days) for sales
-    thirty_days_ago = now - dt.timedelta(days=30)
-    recent_sales = [s for s in sales if s.sale_date and s.sale_date >= thirty_days_ago]
-    seen: Dict[tuple, int] = defaultdict(int)
-    for s in recent_sales:
-        key = (s.document_id, s.product_key)
-        seen[key] += 1
-    for key, count in seen.items():
-        if count > 1:
-            errors += 1
             details.append(
-                f"RECENT_DUPLICATE: {key[0]} {key[1]} apparaît {count} fois en 30 jours"
+                f"INCOMPLETE_RFM: Client {code} a des composantes RFM manquantes"
             )
-    # R4: Low diversity per client
-    client_products: Dict[str, set] = defaultdict(set)
-    for s in sales:
-        client_products[s.client_code].add(s.product_key)
-    for c in clients:
-        count = len(client_products.get(c.client_code, set()))
-        if 0 < count < 2:
-            warnings += 1
-            details.append(
-                f"LOW_DIVERSITY: Client {c.client_code} n'a acheté qu'un seul produit"
+        # R4
+        if code in single_product_codes:
+            low_diversity.append(
+                f"LOW_DIVERSITY: Client {code} n'a acheté qu'un seul produit"
             )
-    # R6-R8, R14, R15: Validate each sale
-    for s in sales:
+        # R5 : regroupement par ``str.lower()`` et non par ``lower()`` SQL,
+        # dont le repli de casse dépend du moteur (ASCII seul sous SQLite)
+        if email:
+            duplicates.setdefault(email.lower(), []).append(code)
+    # R5: Duplicate email
+    for email, email_codes in duplicates.items():
+        if len(email_codes) < 2:
+            continue
+        warnings += 1
+        codes = ", ".join(email_codes)
+        details.append(f"DUPLICATE_EMAIL: L'e‑mail {email} est utilisé par plusieurs clients ({codes})")
+    # Ventes en anomalie (R6-R8, R14) : chaque règle est évaluée par la base
+    # sous forme d'indicateur (EXISTS corrélés pour les références produit /
+    # client) et seules les lignes fautives sont renvoyées.
+    thirty_days_ago = now - dt.timedelta(days=30)
+    sale_errors = 0
+    sale_details = []
+    invalid_value = or_(Sale.quantity <= 0, Sale.amount <= 0)
+    known_product = (
+        exists()
+        .where(
+            Product.tenant_id == tenant_id,
+            Product.product_key == Sale.product_key,
+            Product.product_key != "",
+        )
+        .correlate(Sale)
+    )
+    known_client = (
+        exists()
+        .where(
+            Client.tenant_id == tenant_id,
+            Client.client_code == Sale.client_code,
+            Client.client_code != "",
+        )
+        .correlate(Sale)
+    )
+    sales = (
+        db.query(
+            Sale.document_id,
+            Sale.product_key,
+            Sale.client_code,
+            invalid_value.label("invalid_value"),
+            known_product.label("known_product"),
+            known_client.label("known_client"),
+            (Sale.quantity == 0).label("zero_quantity"),
+        )
+        .filter(Sale.tenant_id == tenant_id, or_(invalid_value, ~known_product, ~known_client))
+        .order_by(Sale.id)
+        .yield_per(10000)
+    )
+    # Méthode liée une fois pour toute la boucle ; un indicateur NULL
+    # (valeur absente) compte comme faux.
+    append = sale_details.append
+    for document_id, product_key, client_code, invalid, has_product, has_client, zero in sales:
         # R6: Invalid sale value (quantity or amount <= 0)
-        if (s.quantity is not None and s.quantity <= 0) or (s.amount is not None and s.amount <= 0):
-            errors += 1
-            details.append(
-                f"INVALID_SALE_VALUE: Vente {s.document_id} {s.product_key} a une quantité ou un montant invalide"
+        if invalid:
+            sale_errors += 1
+            append(
+                f"INVALID_SALE_VALUE: Vente {document_id} {product_key} a une quantité ou un montant invalide"
             )
         # R7: Unknown product
-        if s.product_key not in product_keys:
-            errors += 1
-            details.append(
-                f"UNKNOWN_PRODUCT: Vente {s.document_id} référence un produit inconnu ({s.product_key})"
+        if not has_product:
+            sale_errors += 1
+            append(
+                f"UNKNOWN_PRODUCT: Vente {document_id} référence un produit inconnu ({product_key})"
             )
         # R8: Unknown client
-        if s.client_code not in client_codes:
-            errors += 1
-            details.append(
-                f"UNKNOWN_CLIENT: Vente {s.document_id} référence un client inconnu ({s.client_code})"
+        if not has_client:
+            sale_errors += 1
+            append(
+                f"UNKNOWN_CLIENT: Vente {document_id} référence un client inconnu ({client_code})"
             )
         # R14: Zero quantity
-        if s.quantity is not None and s.quantity == 0:
-            errors += 1
-            details.append(
-                f"ZERO_QUANTITY: Vente {s.document_id} {s.product_key} a une quantité nulle"
+        if zero:
+            sale_errors += 1
+            append(
+                f"ZERO_QUANTITY: Vente {document_id} {product_key} a une quantité nulle"
             )
+    # R3: Recent duplicate (30 days) for sales, agrégé par la base
+    n_sales = func.count()
+    recent_duplicates = (
+        db.query(Sale.document_id, Sale.product_key, n_sales)
+        .filter(Sale.tenant_id == tenant_id, Sale.sale_date >= thirty_days_ago)
+        .group_by(Sale.document_id, Sale.product_key)
+        .having(n_sales > 1)
+        .all()
+    )
+    for document_id, product_key, count in recent_duplicates:
+        errors += 1
+        details.append(
+            f"RECENT_DUPLICATE: {document_id} {product_key} apparaît {count} fois en 30 jours"
+        )
+    # R4: Low diversity (messages collectés lors du passage sur les clients)
+    warnings += len(low_diversity)
+    details.extend(low_diversity)
+    errors += sale_errors
+    details.extend(sale_details)
     # R10-R11, R13: Validate products
-    for p in products:
+    for product_key, price, margin, family in products:
         # R10: Unrealistic price
-        if p.price_ttc is not None:
-            if p.price_ttc <= 0 or p.price_ttc > 1000:
+        if price is not None:
+            if price <= 0 or price > 1000:
                 warnings += 1
                 details.append(
-                    f"UNREALISTIC_PRICE: Produit {p.product_key} a un prix inhabituel ({p.price_ttc})"
+                    f"UNREALISTIC_PRICE: Produit {product_key} a un prix inhabituel ({price})"
                 )
         # R11: Negative margin
-        if p.margin is not None and p.margin < 0:
+        if margin is not None and margin < 0:
             errors += 1
             details.append(
-                f"NEGATIVE_MARGIN: Produit {p.product_key} a une marge négative ({p.margin})"
+                f"NEGATIVE_MARGIN: Produit {product_key} a une marge négative ({margin})"
             )
         # R13: Missing family
-        if not p.family_crm or p.family_crm.strip() == "":
+        if not family or family.strip() == "":
             warnings += 1
             details.append(
-                f"MISSING_FAMILY: Produit {p.product_key} n'a pas de famille CRM définie"
+                f"MISSING_FAMILY: Produit {product_key} n'a pas de famille CRM définie"
             )
+    return _save_log(db, tenant_id, now, errors, warnings, details)
+
+
+def _save_log(
+    db: Session, tenant_id: int, executed_at: dt.datetime, errors: int, warnings: int, details: list
+) -> AuditLog:
+    """Calcule le score et enregistre l'AuditLog."""
     # Calculer le score final
     score = 100 - (40 * errors) - (10 * warnings)
     # Écrire le log
     log = AuditLog(
-        executed_at=now,
+        executed_at=executed_at,
         tenant_id=tenant_id,
         errors=errors,
         warnings=warnings,
-        score=score,
+        # Colonne Float : même type que la valeur relue en base
+        score=float(score),
         details="\n".join(details),
     )
     db.add(log)
+    # Le flush attribue l'identifiant ; détacher l'objet avant le commit
+    # évite l'expiration de ses attributs et donc le SELECT de rechargement.
+    db.flush()
+    db.expunge(log)
     db.commit()
-    db.refresh(log)
-    return log
\ No newline at end of file
+    return log
@@ -20,7 +20,10 @@ SECRET_KEY = os.getenv("JWT_SECRET_KEY", "super-secret-key-change-me")
 ALGORITHM = os.getenv("JWT_ALGO", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = max(5, min(int(os.getenv("JWT_EXPIRE_MINUTES", "60")), 1440))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Coût bcrypt (exponentiel) : 12 en production, abaissé dans les tests
+BCRYPT_ROUNDS = max(4, min(int(os.getenv("BCRYPT_ROUNDS", "12")), 31))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -11,12 +11,15 @@ from __future__ import annotations
 import json
 import logging
 import os
+import time
 import uuid
 from datetime import datetime
 from typing import Any, Dict, List, Protocol, runtime_checkable
 from typing import Any, Dict, List, Tuple, Protocol, runtime_checkable
 from typing import Dict, List, Tuple
 
+import httpx
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from ..models import BrevoLog, Client, ContactHistory, NextActionOutput, RunSummary
@@ -39,6 +42,7 @@ def _log_action(
     run_id: str | None = None,
     batch_id: str | None = None,
 ) -> BrevoLog:
+    """Ajoute le log à la session ; le commit revient à l'appelant."""
     log = BrevoLog(
         run_id=run_id,
         batch_id=batch_id,
@@ -48,29 +52,25 @@ def _log_action(
         tenant_id=tenant_id,
     )
     db.add(log)
-    db.commit()
-    db.refresh(log)
     return log
 
 
-def _record_contact_history(
-    db: Session,
+def _build_contact_history(
     tenant_id: int,
     customer_code: str,
     status: str,
     channel: str = "email",
     meta: Dict | None = None,
-) -> None:
-    history = ContactHistory(
+    contacted_at: datetime | None = None,
+) -> ContactHistory:
+    return ContactHistory(
         customer_code=customer_code,
-        last_contact_at=datetime.utcnow(),
+        last_contact_at=contacted_at or datetime.utcnow(),
         channel=channel,
         status=status,
         meta=json.dumps(meta or {}),
         tenant_id=tenant_id,
     )
-    db.add(history)
-    db.commit()
 
 
 @runtime_checkable
@@ -92,14 +92,80 @@ class DummyBrevoClient:
         return {"status": "noop"}
 
 
+BREVO_BASE_URL = os.getenv("BREVO_BASE_URL", "https://api.brevo.com/v3")
+
+# Client HTTP partagé : le pool de connexions (keep-alive) est réutilisé
+# d'un envoi à l'autre au lieu d'ouvrir une connexion TCP/TLS par appel.
+_http_client: httpx.Client | None = None
+
+
+def _shared_http_client() -> httpx.Client:
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.Client(timeout=10.0)
+    return _http_client
+
+
+def _pooled_post(url: str, headers: Dict[str, str], json: Dict[str, Any], timeout: float) -> httpx.Response:
+    return _shared_http_client().post(url, headers=headers, json=json, timeout=timeout)
+
+
+class RealBrevoClient:
+    """Client HTTP Brevo réel, avec relances sur 429 et erreurs 5xx."""
+
+    def __init__(
+        self,
+        api_key: str,
+        http_post=None,
+        base_url: str = BREVO_BASE_URL,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 10.0,
+    ) -> None:
+        self.api_key = api_key
+        self.http_post = http_post or _pooled_post
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+    def send_batch(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        body = {
+            "templateId": payload["template_id"],
+            "messageVersions": [
+                {"to": [{"email": c["email"], "name": c.get("name") or c["email"]}]}
+                for c in payload.get("contacts", [])
+            ],
+            "headers": {"X-Mailin-custom": f"run:{payload.get('run_id')}|batch:{payload.get('batch_id')}"},
+        }
+        headers = {"api-key": self.api_key, "accept": "application/json", "content-type": "application/json"}
+        response = None
+        for attempt in range(self.max_retries + 1):
+            response = self.http_post(
+                f"{self.base_url}/smtp/email", headers=headers, json=body, timeout=self.timeout
+            )
+            if response.status_code != 429 and response.status_code < 500:
+                break
+            if attempt < self.max_retries:
+                time.sleep(self.backoff * (2 ** attempt))
+        if response.status_code < 300:
+            return {"status": "sent", "response": response.json()}
+        logger.error(f"Brevo a répondu {response.status_code} : {response.text[:200]}")
+        return {"status": "error", "status_code": response.status_code}
+
+
 def sync_contacts(db: Session, tenant_id: int, force_dry_run: bool | None = None) -> Dict:
     """Prépare la synchro des contacts Brevo (DRY RUN par défaut)."""
     dry_run = _is_dry_run(force_dry_run)
-    clients = db.query(Client).filter(Client.tenant_id == tenant_id).all()
+    clients = (
+        db.query(Client.email, Client.client_code, Client.name)
+        .filter(Client.tenant_id == tenant_id)
+        .all()
+    )
     exported = [
-        {"email": c.email, "customer_code": c.client_code, "name": c.name}
-        for c in clients
-        if c.email
+        {"email": email, "customer_code": code, "name": name}
+        for email, code, name in clients
+        if email
     ]
     batch_id = uuid.uuid4().hex
     status = "dry_run" if dry_run else "ready"
@@ -111,6 +177,7 @@ def sync_contacts(db: Session, tenant_id: int, force_dry_run: bool | None = None
         payload={"count": len(exported)},
         batch_id=batch_id,
     )
+    db.commit()
     return {"synced": len(exported), "dry_run": dry_run, "batch_id": batch_id, "preview": exported[:5]}
 
 
@@ -142,28 +209,30 @@ def send_batch(
     if not summary_json.get("gate_export", False):
         raise ValueError("Export gating disabled for this run")
 
-    eligible_rows = (
-        db.query(NextActionOutput)
+    client_codes = [
+        code
+        for (code,) in db.query(NextActionOutput.customer_code)
         .filter(
             NextActionOutput.run_id == run_id,
             NextActionOutput.tenant_id == tenant_id,
             NextActionOutput.eligible == True,  # noqa: E712
         )
-        .all()
-    )
-    if not eligible_rows:
+        .limit(batch_size)
+    ]
+    if not client_codes:
         raise ValueError("No eligible contacts for this run")
 
-    client_codes = [row.customer_code for row in eligible_rows][:batch_size]
+    # Colonnes utiles uniquement (pas d'objets ORM) ; batch_size borne la
+    # liste IN à 300 codes, sous les limites de paramètres des pilotes.
     clients = (
-        db.query(Client)
+        db.query(Client.email, Client.client_code, Client.name)
         .filter(Client.tenant_id == tenant_id, Client.client_code.in_(client_codes))
         .all()
     )
     preview = [
-        {"email": c.email, "customer_code": c.client_code, "name": c.name}
-        for c in clients
-        if c.email
+        {"email": email, "customer_code": code, "name": name}
+        for email, code, name in clients
+        if email
     ][:5]
     batch_id = uuid.uuid4().hex
     status = "dry_run" if dry_run or preview_only else "ready"
@@ -182,10 +251,21 @@ def send_batch(
         run_id=run_id,
         batch_id=batch_id,
     )
-    for c in preview:
-        _record_contact_history(db, tenant_id, c["customer_code"], status=status, meta={"batch_id": batch_id})
+    # Historique des contacts écrit avec le log, en un seul commit
+    contacted_at = datetime.utcnow()
+    db.add_all(
+        [
+            _build_contact_history(
+                tenant_id, c["customer_code"], status=status, meta={"batch_id": batch_id},
+                contacted_at=contacted_at,
+            )
+            for c in preview
+        ]
+    )
+    db.commit()
     if not dry_run and not preview_only:
-        http_client = client or DummyBrevoClient(os.getenv("BREVO_API_KEY"))
+        api_key = os.getenv("BREVO_API_KEY")
+        http_client = client or (RealBrevoClient(api_key) if api_key else DummyBrevoClient(api_key))
         http_client.send_batch(
             {
                 "template_id": template_id,
@@ -204,6 +284,47 @@ def send_batch(
     }
 
 
+def _record_contact_events(
+    db: Session,
+    tenant_id: int,
+    client_codes: List[str],
+    *,
+    campaign_id: int | None,
+    channel: str,
+    status: str,
+) -> None:
+    """Crée un ContactEvent par code client connu, en une requête et un commit."""
+    try:
+        from ..models import ContactEvent  # import local pour éviter les cycles
+
+        # Premier client rencontré pour chaque code (comme ``.first()``)
+        client_ids: Dict[str, int] = {}
+        for client_id, code in (
+            db.query(Client.id, Client.client_code)
+            .filter(Client.tenant_id == tenant_id, Client.client_code.in_(set(client_codes)))
+            .order_by(Client.id)
+        ):
+            client_ids.setdefault(code, client_id)
+        contact_date = datetime.utcnow()
+        events = [
+            ContactEvent(
+                client_id=client_ids[code],
+                contact_date=contact_date,
+                channel=channel,
+                status=status,
+                campaign_id=campaign_id,
+                tenant_id=tenant_id,
+            )
+            for code in client_codes
+            if code in client_ids
+        ]
+        if events:
+            db.add_all(events)
+            db.commit()
+    except Exception as exc:  # noqa: BLE001
+        logger.error(f"Erreur lors de la création du ContactEvent : {exc}")
+
+
 # Historique legacy pour les campagnes simples
 def send_email(
     to: str,
@@ -226,51 +347,68 @@ def send_email(
         logger.info("[BREVO REAL] Envoi réel activé (non implémenté ici).")
 
     if db is not None and tenant_id is not None and client_code:
-        try:
-            from ..models import Client, ContactEvent  # import local pour éviter les cycles
+        _record_contact_events(
+            db,
+            tenant_id,
+            [client_code],
+            campaign_id=campaign_id,
+            channel=channel,
+            status=status if not dry_run else "dry_run",
+        )
 
-            client = (
-                db.query(Client)
-                .filter(Client.client_code == client_code, Client.tenant_id == tenant_id)
-                .first()
-            )
-            if client:
-                contact = ContactEvent(
-                    client_id=client.id,
-                    contact_date=datetime.utcnow(),
-                    channel=channel,
-                    status=status if not dry_run else "dry_run",
-                    campaign_id=campaign_id,
-                    tenant_id=tenant_id,
-                )
-                db.add(contact)
-                db.commit()
-        except Exception as exc:  # noqa: BLE001
-            logger.error(f"Erreur lors de la création du ContactEvent : {exc}")
+
+def send_email_bulk(
+    db: Session,
+    tenant_id: int,
+    messages: List[Dict[str, Any]],
+    *,
+    campaign_id: int | None = None,
+    channel: str = "email",
+    status: str = "delivered",
+) -> int:
+    """Simule l'envoi d'une série d'e-mails et journalise les contacts en un commit.
+
+    Chaque message est un dictionnaire ``to``/``subject``/``html_content``/
+    ``client_code``. Les clients sont résolus en une seule requête ``IN`` et
+    les ContactEvent insérés ensemble ; retourne le nombre de messages.
+    """
+    dry_run = _is_dry_run()
+    if dry_run or not os.getenv("BREVO_API_KEY"):
+        logger.info(f"[BREVO DRY RUN] {len(messages)} e-mails simulés (aucun appel réseau).")
+    else:
+        logger.info("[BREVO REAL] Envoi réel activé (non implémenté ici).")
+
+    client_codes = [m["client_code"] for m in messages if m.get("client_code")]
+    if client_codes:
+        _record_contact_events(
+            db,
+            tenant_id,
+            client_codes,
+            campaign_id=campaign_id,
+            channel=channel,
+            status=status if not dry_run else "dry_run",
+        )
+    return len(messages)
 
 
 def get_campaign_stats(db: Session, tenant_id: int, campaign_id: int) -> Dict[str, int]:
     """Retourne des statistiques simples pour une campagne."""
     from ..models import ContactEvent  # import local pour éviter les cycles
 
-    stats = {"sent": 0, "open": 0, "click": 0, "bounce": 0, "unsubscribe": 0}
-    events = (
-        db.query(ContactEvent)
+    # Comptage par statut agrégé par la base
+    counts = dict(
+        db.query(ContactEvent.status, func.count())
         .filter(
             ContactEvent.tenant_id == tenant_id,
             ContactEvent.campaign_id == campaign_id,
         )
+        .group_by(ContactEvent.status)
         .all()
     )
-    for ev in events:
-        if ev.status in {"delivered", "dry_run"}:
-            stats["sent"] += 1
-        elif ev.status == "open":
-            stats["open"] += 1
-        elif ev.status == "click":
-            stats["click"] += 1
-        elif ev.status == "bounce":
-            stats["bounce"] += 1
-        elif ev.status == "unsubscribe":
-            stats["unsubscribe"] += 1
-    return stats
+    return {
+        "sent": counts.get("delivered", 0) + counts.get("dry_run", 0),
+        "open": counts.get("open", 0),
+        "click": counts.get("click", 0),
+        "bounce": counts.get("bounce", 0),
+        "unsubscribe": counts.get("unsubscribe", 0),
+    }
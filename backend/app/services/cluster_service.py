@@ -8,12 +8,13 @@ complémentaire aux segments RFM et d'identifier des groupes de
 comportement similaires. Le nombre de clusters par défaut est 4, mais
 peut être ajusté en paramètre.
 
-L'algorithme K‑means implémenté ici effectue un nombre fixe
-d'itérations et initialise les centres aléatoirement. Il est destiné à
-être utilisé sur des jeux de données de taille modeste (quelques
-centaines ou milliers de clients). Pour des volumes plus importants ou
-des fonctionnalités avancées (initialisation K‑means++, scoring par
-silhouette), l'utilisation de scikit‑learn est recommandée.
+L'algorithme K‑means implémenté ici initialise les centres selon
+K‑means++ et s'arrête dès que les affectations sont stables (ou après
+un nombre maximal d'itérations). Il est destiné à être utilisé sur des
+jeux de données de taille modeste (quelques centaines ou milliers de
+clients). Pour des volumes plus importants ou des fonctionnalités
+avancées (scoring par silhouette), l'utilisation de scikit‑learn est
+recommandée.
 """
 
 from __future__ import annotations
@@ -45,15 +46,45 @@ def _normalize_features(values: np.ndarray) -> np.ndarray:
 
 
 def _initialize_centers(data: np.ndarray, k: int) -> np.ndarray:
-    """Choisit aléatoirement k lignes de data comme centres initiaux."""
-    indices = random.sample(range(data.shape[0]), k)
+    """Choisit k centres initiaux selon K‑means++.
+
+    Le premier centre est tiré au hasard ; chaque centre suivant est tiré
+    avec une probabilité proportionnelle au carré de la distance au centre
+    déjà choisi le plus proche, ce qui écarte les centres les uns des
+    autres et réduit le nombre d'itérations nécessaires.
+    """
+    n = data.shape[0]
+    indices = [random.randrange(n)]
+    closest_sq = ((data - data[indices[0]]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        cumulative = np.cumsum(closest_sq)
+        total = cumulative[-1]
+        if total <= 0:
+            # Points tous confondus avec les centres : tirage uniforme
+            candidates = [i for i in range(n) if i not in indices]
+            idx = random.choice(candidates)
+        else:
+            idx = int(np.searchsorted(cumulative, random.random() * total, side="right"))
+            idx = min(idx, n - 1)
+        indices.append(idx)
+        closest_sq = np.minimum(closest_sq, ((data - data[idx]) ** 2).sum(axis=1))
     return data[indices].copy()
 
 
-def _assign_clusters(data: np.ndarray, centers: np.ndarray) -> np.ndarray:
-    """Assigne chaque point au centre le plus proche en distance euclidienne."""
-    # Calculer la distance euclidienne au carré pour chaque centre
-    distances = np.linalg.norm(data[:, None, :] - centers[None, :, :], axis=2)
+def _assign_clusters(
+    data: np.ndarray, centers: np.ndarray, data_sq: np.ndarray | None = None
+) -> np.ndarray:
+    """Assigne chaque point au centre le plus proche en distance euclidienne.
+
+    ``data_sq`` (normes au carré des points, forme (n, 1)) peut être
+    précalculé par l'appelant puisqu'il ne change pas d'une itération à
+    l'autre.
+    """
+    if data_sq is None:
+        data_sq = (data * data).sum(axis=1, keepdims=True)
+    # Distance euclidienne au carré via ‖x-c‖² = ‖x‖² - 2·x·c + ‖c‖² : un
+    # produit matriciel (n, k) plutôt qu'un tenseur intermédiaire (n, k, d)
+    distances = data_sq - 2.0 * (data @ centers.T) + (centers * centers).sum(axis=1)
     return distances.argmin(axis=1)
 
 
@@ -84,8 +115,9 @@ def kmeans(data: np.ndarray, k: int, max_iter: int = 20) -> Tuple[np.ndarray, np
         raise ValueError("Le nombre de points est inférieur au nombre de clusters")
     centers = _initialize_centers(data, k)
     labels = np.zeros(data.shape[0], dtype=int)
+    data_sq = (data * data).sum(axis=1, keepdims=True)
     for _ in range(max_iter):
-        new_labels = _assign_clusters(data, centers)
+        new_labels = _assign_clusters(data, centers, data_sq)
         if np.array_equal(new_labels, labels):
             break
         labels = new_labels
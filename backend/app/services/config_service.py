@@ -16,6 +16,7 @@ ou une structure (qui sera sérialisée en JSON).
 from __future__ import annotations
 
 import json
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Any, Dict
 
@@ -39,6 +40,19 @@ def _serialize_value(value: Any) -> str:
     return str(value)
 
 
+@lru_cache(maxsize=4)
+def _load_raw_config(path: str, mtime: float) -> Dict[str, Any]:
+    """Lit et parse le fichier YAML, mis en cache par (chemin, date de modification).
+
+    Le résultat est partagé entre les appels : il ne doit pas être modifié.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            return yaml.safe_load(f) or {}
+        except yaml.YAMLError:
+            return {}
+
+
 def load_defaults(db: Session, tenant_id: int) -> None:
     """Charge les paramètres par défaut depuis le fichier YAML pour un tenant.
 
@@ -47,25 +61,24 @@ def load_defaults(db: Session, tenant_id: int) -> None:
     """
     if not DEFAULT_CONFIG_PATH.exists():
         return
-    with open(DEFAULT_CONFIG_PATH, "r", encoding="utf-8") as f:
-        try:
-            raw_config: Dict[str, Any] = yaml.safe_load(f) or {}
-        except yaml.YAMLError:
-            raw_config = {}
-    for key, value in raw_config.items():
-        existing = (
-            db.query(ConfigSetting)
-            .filter(ConfigSetting.tenant_id == tenant_id, ConfigSetting.key == key)
-            .first()
+    raw_config = _load_raw_config(str(DEFAULT_CONFIG_PATH), DEFAULT_CONFIG_PATH.stat().st_mtime)
+    # Clés déjà présentes pour le tenant, chargées en une seule requête
+    existing_keys = {
+        key
+        for (key,) in db.query(ConfigSetting.key).filter(ConfigSetting.tenant_id == tenant_id)
+    }
+    missing = [
+        ConfigSetting(
+            tenant_id=tenant_id,
+            key=key,
+            value=_serialize_value(value),
+            description=f"Default setting for {key}",
         )
-        if not existing:
-            setting = ConfigSetting(
-                tenant_id=tenant_id,
-                key=key,
-                value=_serialize_value(value),
-                description=f"Default setting for {key}",
-            )
-            db.add(setting)
+        for key, value in raw_config.items()
+        if key not in existing_keys
+    ]
+    if missing:
+        db.add_all(missing)
     db.commit()
 
 
@@ -16,13 +16,15 @@ Les calculs se basent sur les tables ``sales`` et ``products``.
 
 from __future__ import annotations
 
-from collections import Counter, defaultdict
+import heapq
+from collections import defaultdict
 from typing import Dict, List
 
 import numpy as np
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from ..models import Client, Sale, Product
+from ..models import Band, Client, Sale, Product
 
 
 def compute_client_preferences(db: Session, tenant_id: int) -> None:
@@ -30,53 +32,61 @@ def compute_client_preferences(db: Session, tenant_id: int) -> None:
 
     Pour chaque client du tenant :
 
-    1. On récupère toutes ses ventes et on agrège par famille de
-       produits afin d’identifier les familles les plus fréquentes (top 2).
+    1. On compte ses ventes par famille de produits (agrégation SQL) afin
+       d’identifier les familles les plus fréquentes (top 2).
     2. On utilise le champ ``average_order_value`` déjà calculé via RFM
        pour déterminer une bande de budget : Low, Medium ou High.
     3. Les champs ``preferred_families`` et ``budget_band`` du client sont
        mis à jour.
     """
-    # Préparer un mapping produit_key -> famille
-    products = (
-        db.query(Product)
-        .filter(Product.tenant_id == tenant_id)
-        .all()
+    # Nombre d'achats par (client, famille) agrégé par la base ; un produit
+    # inconnu ou sans famille compte comme « unknown ». Le plus petit
+    # identifiant de vente départage les ex æquo (première famille achetée).
+    family = func.coalesce(func.nullif(Product.family_crm, ""), "unknown")
+    rows = (
+        db.query(Sale.client_code, family, func.count(), func.min(Sale.id))
+        .outerjoin(
+            Product,
+            (Product.product_key == Sale.product_key) & (Product.tenant_id == tenant_id),
+        )
+        .filter(Sale.tenant_id == tenant_id)
+        .group_by(Sale.client_code, family)
+        .yield_per(5000)
     )
-    family_map: Dict[str, str] = {p.product_key: (getattr(p, 'family_crm', None) or getattr(p, 'family', None) or 'unknown') for p in products}
-    # Récupérer toutes les ventes
-    sales = db.query(Sale).filter(Sale.tenant_id == tenant_id).all()
-    # Organiser par client_code
-    client_families: Dict[str, List[str]] = defaultdict(list)
-    for sale in sales:
-        fam = family_map.get(sale.product_key, "unknown")
-        client_families[sale.client_code].append(fam)
+    client_families: Dict[str, List[tuple]] = defaultdict(list)
+    for code, fam, count, first_sale in rows:
+        client_families[code].append((-count, first_sale, fam))
     # Obtenir la distribution des paniers moyens pour évaluer les budgets
-    clients = db.query(Client).filter(Client.tenant_id == tenant_id).all()
-    aovs = [c.average_order_value for c in clients if c.average_order_value]
+    clients = (
+        db.query(Client.id, Client.client_code, Client.average_order_value)
+        .filter(Client.tenant_id == tenant_id)
+        .all()
+    )
+    aovs = [aov for _, _, aov in clients if aov]
     if aovs:
         q1, q3 = np.quantile(aovs, [0.33, 0.66])
     else:
         q1 = q3 = 0.0
-    # Mettre à jour chaque client
-    for client in clients:
-        fams = client_families.get(client.client_code, [])
+    # Mettre à jour chaque client (UPDATE exécutés en lot)
+    updates = []
+    for client_id, code, aov in clients:
+        update = {"id": client_id}
+        fams = client_families.get(code)
         if fams:
-            counts = Counter(fams)
-            top_families = [f for f, _ in counts.most_common(2)]
-            client.preferred_families = ",".join(top_families)
+            update["preferred_families"] = ",".join(f for _, _, f in heapq.nsmallest(2, fams))
         # Déterminer budget band
-        aov = client.average_order_value or 0.0
+        aov = aov or 0.0
         if aov == 0.0 or q3 == 0.0:
             band = None
         elif aov <= q1:
-            band = "Low"
+            band = Band.LOW
         elif aov <= q3:
-            band = "Medium"
+            band = Band.MEDIUM
         else:
-            band = "High"
-        client.budget_band = band
-        db.add(client)
+            band = Band.HIGH
+        update["budget_band"] = band.label if band is not None else None
+        updates.append(update)
+    db.bulk_update_mappings(Client, updates)
     db.commit()
 
 
@@ -87,17 +97,18 @@ def compute_products_popularity(db: Session, tenant_id: int) -> None:
     nombre total de ventes. Il est enregistré dans le champ
     ``global_popularity_score`` de la table ``products``.
     """
-    # Compter le nombre de ventes par produit
-    sales = db.query(Sale).filter(Sale.tenant_id == tenant_id).all()
-    if not sales:
+    total_sales = db.query(func.count(Sale.id)).filter(Sale.tenant_id == tenant_id).scalar()
+    if not total_sales:
         return
-    total_sales = len(sales)
-    counts: Dict[str, int] = defaultdict(int)
-    for sale in sales:
-        counts[sale.product_key] += 1
-    # Mettre à jour chaque produit
-    products = db.query(Product).filter(Product.tenant_id == tenant_id).all()
-    for prod in products:
-        prod.global_popularity_score = counts.get(prod.product_key, 0) / total_sales
-        db.add(prod)
-    db.commit()
\ No newline at end of file
+    # Un seul UPDATE : nombre de ventes de chaque produit (sous-requête
+    # corrélée) divisé par le nombre total de ventes du tenant
+    sales_count = (
+        select(func.count(Sale.id))
+        .where(Sale.tenant_id == tenant_id, Sale.product_key == Product.product_key)
+        .scalar_subquery()
+    )
+    db.query(Product).filter(Product.tenant_id == tenant_id).update(
+        {Product.global_popularity_score: sales_count / float(total_sales)},
+        synchronize_session=False,
+    )
+    db.commit()
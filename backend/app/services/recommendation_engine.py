@@ -24,6 +24,7 @@ from sqlalchemy.orm import Session
 
 from ..models import (
     AuditOutput,
+    Band,
     Client,
     ContactEvent,
     NextActionOutput,
@@ -73,7 +74,7 @@ def _select_scenario(client: Client) -> str:
                 return "winback"
             if days > 30:
                 return "rebuy"
-        if client.budget_band == "Low":
+        if Band.from_label(client.budget_band) is Band.LOW:
             return "upsell"
         return "cross_sell"
 
@@ -348,7 +349,21 @@ def generate_recommendations_run(
     db.commit()
     db.refresh(run)
 
-    products: List[Product] = db.query(Product).filter(Product.tenant_id == tenant_id).all()
+    # Catalogue chargé une fois pour tout le run, en lignes légères (colonnes
+    # lues par les règles de reco et d'audit) plutôt qu'en objets ORM.
+    products = (
+        db.query(
+            Product.id,
+            Product.product_key,
+            Product.name,
+            Product.price_ttc,
+            Product.family_crm,
+            Product.sucrosite_niveau,
+            Product.global_popularity_score,
+        )
+        .filter(Product.tenant_id == tenant_id)
+        .all()
+    )
     product_map = {p.product_key: p for p in products if p.product_key}
     clients: List[Client] = db.query(Client).filter(Client.tenant_id == tenant_id).all()
     sales: List[Sale] = db.query(Sale).filter(Sale.tenant_id == tenant_id).all()
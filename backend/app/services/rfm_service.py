@@ -16,12 +16,14 @@ et ``rfm_segment``. Des champs auxiliaires tels que
 from __future__ import annotations
 
 import datetime as dt
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from ..models import Client, Sale
+from .analytics_service import invalidate_cache
 
 
 def _compute_basic_metrics(db: Session, tenant_id: int) -> Dict[str, Dict[str, float]]:
@@ -42,106 +44,75 @@ def _compute_basic_metrics(db: Session, tenant_id: int) -> Dict[str, Dict[str, f
         Un dictionnaire `client_code -> metrics dict`.
     """
     metrics: Dict[str, Dict[str, float]] = {}
-    # Récupérer toutes les ventes pour le tenant
-    sales = db.query(Sale).filter(Sale.tenant_id == tenant_id).all()
-    if not sales:
-        return metrics
-    # Grouper par client_code
-    for sale in sales:
-        code = sale.client_code
-        if code not in metrics:
-            metrics[code] = {
-                "last_purchase_date": sale.sale_date,
-                "total_spent": 0.0,
-                "documents": set(),
-            }
-        # Mettre à jour la date de dernière vente
-        if sale.sale_date and (
-            metrics[code]["last_purchase_date"] is None
-            or sale.sale_date > metrics[code]["last_purchase_date"]
-        ):
-            metrics[code]["last_purchase_date"] = sale.sale_date
-        # Calculer le montant (fallback sur amount ou quantity)
-        amount = 0.0
-        if sale.amount is not None:
-            amount = float(sale.amount)
-        elif sale.quantity is not None:
-            # S'il n'y a pas de montant, utiliser la quantité comme proxy
-            amount = float(sale.quantity)
-        metrics[code]["total_spent"] += amount
-        # Ajouter l'ID du document
-        if sale.document_id:
-            metrics[code]["documents"].add(sale.document_id)
-    # Post‑traitement pour total_orders et AOV
-    for code, data in metrics.items():
-        total_orders = len(data["documents"])
-        data["total_orders"] = total_orders
-        data["average_order_value"] = data["total_spent"] / total_orders if total_orders > 0 else 0.0
+    # Une seule requête agrégée par client_code. Le montant retombe sur la
+    # quantité (proxy) puis 0 ; les documents vides ne comptent pas.
+    rows = (
+        db.query(
+            Sale.client_code,
+            func.max(Sale.sale_date),
+            func.sum(func.coalesce(Sale.amount, Sale.quantity, 0.0)),
+            func.count(func.distinct(func.nullif(Sale.document_id, ""))),
+        )
+        .filter(Sale.tenant_id == tenant_id)
+        .group_by(Sale.client_code)
+    )
+    for code, last_purchase_date, total_spent, total_orders in rows:
+        total_spent = float(total_spent or 0.0)
+        metrics[code] = {
+            "last_purchase_date": last_purchase_date,
+            "total_spent": total_spent,
+            "total_orders": total_orders,
+            "average_order_value": total_spent / total_orders if total_orders > 0 else 0.0,
+        }
     return metrics
 
 
-def _quantile_scores(values: List[float]) -> Dict[str, int]:
+def _quantile_scores(values: List[Optional[float]], ascending: bool = False) -> np.ndarray:
     """Calcule des scores 1–5 sur la base de quintiles.
 
-    Le plus haut quintile reçoit un score de 5, le plus bas un score de 1.
+    Par défaut (récence), une valeur plus faible est meilleure : le plus
+    bas quintile reçoit 5 et le plus haut 1. Avec ``ascending=True``
+    (fréquence, montant), l'ordre est inversé.
 
     Args:
         values: liste de valeurs numériques.
+        ascending: ``True`` si une valeur plus grande est meilleure.
 
     Returns:
-        Un dict `id -> score` où la clé est l'identifiant tel que fourni
-        dans l'ordre original. Les valeurs `None` sont ignorées et
-        reçoivent un score de 0.
+        Un tableau de scores dans l'ordre des valeurs fournies. Les valeurs
+        `None` sont ignorées et reçoivent un score de 0.
     """
-    if not values:
-        return {}
-    arr = np.array([v for v in values if v is not None])
-    if arr.size == 0:
-        return {}
+    arr = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    scores = np.zeros(arr.size, dtype=np.int64)
+    known = ~np.isnan(arr)
+    if not known.any():
+        return scores
     # Calcul des seuils de quintile
-    quintiles = np.quantile(arr, [0.2, 0.4, 0.6, 0.8])
-    scores = []
-    for v in values:
-        if v is None:
-            scores.append(0)
-            continue
-        # Pour recency, une valeur plus faible est meilleure (plus récent)
-        # Nous assignons donc les scores inversément : plus petit -> 5.
-        if quintiles is not None:
-            if v <= quintiles[0]:
-                s = 5
-            elif v <= quintiles[1]:
-                s = 4
-            elif v <= quintiles[2]:
-                s = 3
-            elif v <= quintiles[3]:
-                s = 2
-            else:
-                s = 1
-        else:
-            s = 3
-        scores.append(int(s))
+    quintiles = np.quantile(arr[known], [0.2, 0.4, 0.6, 0.8])
+    # Nombre de seuils strictement inférieurs : v <= q1 -> 0, ..., v > q4 -> 4
+    buckets = np.searchsorted(quintiles, arr[known], side="left")
+    scores[known] = buckets + 1 if ascending else 5 - buckets
     return scores
 
 
-def _map_segment(r_score: int, f_score: int, m_score: int) -> str:
-    """Retourne un segment basé sur les scores R, F et M.
+_SEGMENTS = ["Champions", "Loyal Customers", "Big Spenders", "Recent Customers", "Promising", "At Risk"]
+
 
-    Les règles de segmentation sont inspirées des meilleures pratiques RFM.
+def _map_segments(r: np.ndarray, f: np.ndarray, m: np.ndarray) -> List[str]:
+    """Retourne le segment de chaque client à partir des scores R, F et M.
+
+    Les règles de segmentation sont inspirées des meilleures pratiques RFM ;
+    la première condition vérifiée l'emporte.
     """
-    if r_score >= 4 and f_score >= 4 and m_score >= 4:
-        return "Champions"
-    if f_score >= 4 and r_score >= 3:
-        return "Loyal Customers"
-    if m_score >= 4 and f_score >= 3:
-        return "Big Spenders"
-    if r_score >= 4 and f_score <= 2:
-        return "Recent Customers"
-    if r_score >= 3 and f_score >= 2 and m_score >= 2:
-        return "Promising"
-    if r_score <= 2 and f_score <= 2:
-        return "At Risk"
-    return "Others"
+    conditions = [
+        (r >= 4) & (f >= 4) & (m >= 4),
+        (f >= 4) & (r >= 3),
+        (m >= 4) & (f >= 3),
+        (r >= 4) & (f <= 2),
+        (r >= 3) & (f >= 2) & (m >= 2),
+        (r <= 2) & (f <= 2),
+    ]
+    return np.select(conditions, _SEGMENTS, default="Others").tolist()
 
 
 def compute_rfm_for_tenant(db: Session, tenant_id: int) -> None:
@@ -157,7 +128,7 @@ def compute_rfm_for_tenant(db: Session, tenant_id: int) -> None:
        toutes les ventes comme référence.
     3. Application de la fonction ``_quantile_scores`` aux listes de
        recency, frequency et monetary pour obtenir des scores 1–5.
-    4. Attribution d’un segment via ``_map_segment``.
+    4. Attribution d’un segment via ``_map_segments``.
     5. Mise à jour de la table ``clients`` avec toutes ces valeurs.
     """
     metrics = _compute_basic_metrics(db, tenant_id)
@@ -183,67 +154,43 @@ def compute_rfm_for_tenant(db: Session, tenant_id: int) -> None:
         frequency_list.append(float(data["total_orders"]))
         monetary_list.append(float(data["total_spent"]))
         client_codes.append(code)
-    # Calcul des scores (inverse de recency pour R)
-    # Pour la récence nous voulons que plus le nombre de jours est faible,
-    # plus le score est élevé. La fonction _quantile_scores retourne déjà
-    # des scores inverses.
+    # Calcul des scores : plus la récence est faible, plus le score est
+    # élevé ; pour la fréquence et le montant, c'est l'inverse.
     r_scores = _quantile_scores(recency_list)
-    # Pour la fréquence et le montant, plus la valeur est grande, plus le score est élevé.
-    # Nous pouvons simplement appliquer _quantile_scores à la valeur négative afin que
-    #  les plus grandes valeurs obtiennent les plus grands scores.
-    # Toutefois, nous devons recalculer les quintiles en inversant l'ordre.
-    # Nous procédons en triant l'ordre puis en mappant.
-    # Inverser les listes pour frequency et monetary
-    # Convertir en rangs et ensuite appliquer la règle.
-    def score_positive(values: List[float]) -> List[int]:
-        arr = np.array([v for v in values if v is not None])
-        if arr.size == 0:
-            return [0 for _ in values]
-        quintiles = np.quantile(arr, [0.2, 0.4, 0.6, 0.8])
-        scores: List[int] = []
-        for v in values:
-            if v is None:
-                scores.append(0)
-                continue
-            if v <= quintiles[0]:
-                s = 1
-            elif v <= quintiles[1]:
-                s = 2
-            elif v <= quintiles[2]:
-                s = 3
-            elif v <= quintiles[3]:
-                s = 4
-            else:
-                s = 5
-            scores.append(int(s))
-        return scores
-
-    f_scores = score_positive(frequency_list)
-    m_scores = score_positive(monetary_list)
-    # Mettre à jour chaque client
+    f_scores = _quantile_scores(frequency_list, ascending=True)
+    m_scores = _quantile_scores(monetary_list, ascending=True)
+    # Score composite (somme) et segment, calculés pour tous les clients
+    rfm_scores = (r_scores + f_scores + m_scores).tolist()
+    segments = _map_segments(r_scores, f_scores, m_scores)
+    # Premier client (par identifiant) de chaque code, chargé en une requête
+    client_ids: Dict[str, int] = {}
+    for client_id, code in (
+        db.query(Client.id, Client.client_code)
+        .filter(Client.tenant_id == tenant_id)
+        .order_by(Client.id)
+    ):
+        client_ids.setdefault(code, client_id)
+    # Mettre à jour chaque client (UPDATE exécutés en lot)
+    updates = []
     for idx, code in enumerate(client_codes):
-        client = (
-            db.query(Client)
-            .filter(Client.tenant_id == tenant_id, Client.client_code == code)
-            .first()
-        )
-        if client:
-            data = metrics[code]
-            client.last_purchase_date = data.get("last_purchase_date")
-            client.total_spent = data.get("total_spent", 0.0)
-            client.total_orders = data.get("total_orders", 0)
-            client.average_order_value = data.get("average_order_value", 0.0)
-            client.recency = recency_list[idx] if recency_list[idx] is not None else 0.0
-            client.frequency = frequency_list[idx]
-            client.monetary = monetary_list[idx]
-            r_score = r_scores[idx] if idx < len(r_scores) else 0
-            f_score = f_scores[idx] if idx < len(f_scores) else 0
-            m_score = m_scores[idx] if idx < len(m_scores) else 0
-            # Score composite (somme) pour rfm_score
-            client.rfm_score = r_score + f_score + m_score
-            client.rfm_segment = _map_segment(r_score, f_score, m_score)
-            # Sauvegarder
-            db.add(client)
+        client_id = client_ids.get(code)
+        if client_id is None:
+            continue
+        data = metrics[code]
+        updates.append({
+            "id": client_id,
+            "last_purchase_date": data.get("last_purchase_date"),
+            "total_spent": data.get("total_spent", 0.0),
+            "total_orders": data.get("total_orders", 0),
+            "average_order_value": data.get("average_order_value", 0.0),
+            "recency": recency_list[idx] if recency_list[idx] is not None else 0.0,
+            "frequency": frequency_list[idx],
+            "monetary": monetary_list[idx],
+            "rfm_score": rfm_scores[idx],
+            "rfm_segment": segments[idx],
+        })
+    db.bulk_update_mappings(Client, updates)
+    invalidate_cache(tenant_id, db)
     db.commit()
 
 # --- compat shim (required by app.tasks) ---
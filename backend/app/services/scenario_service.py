@@ -16,6 +16,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Dict, Optional
 
+import orjson
+
 from ..models import Client
 
 
@@ -59,8 +61,7 @@ class ScenarioService:
         coverage = 0.0
         if client.preferred_families:
             try:
-                import json
-                prefs = json.loads(client.preferred_families)
+                prefs = orjson.loads(client.preferred_families)
                 # Compute sum of shares of top 2 families
                 shares = [p.get("share", 0.0) for p in prefs]
                 coverage = sum(shares[:2])
@@ -76,8 +77,7 @@ class ScenarioService:
         aroma_conf = 0.0
         if client.aroma_profile:
             try:
-                import json
-                ap = json.loads(client.aroma_profile)
+                ap = orjson.loads(client.aroma_profile)
                 aroma_conf = ap.get("confidence", 0.0)
             except Exception:
                 aroma_conf = 0.0
@@ -23,7 +23,8 @@ To start a worker:
 To start the beat scheduler (for periodic tasks):
   celery -A app.tasks beat --loglevel=info
 
-The beat schedule is configured to run the ETL every Monday at 03:00.
+The beat schedule is configured to run the ETL every Monday at 03:00 and
+to refresh the analytics snapshots every hour.
 """
 
 from __future__ import annotations
@@ -39,6 +40,8 @@ from .routers.etl import run_etl_for_tenants
 from .services.rfm_service import compute_rfm_scores_for_tenant
 from .services.recommendation_engine import generate_recommendations_run
 from .services.brevo_service import send_email
+from .services.analytics_service import refresh_overview_snapshot
+from .models import Tenant
 
 
 def _get_bool_env(key: str, default: bool = False) -> bool:
@@ -144,6 +147,23 @@ def send_email_task(
     return f"Email sent to {client_code} for tenant {tenant_id}"
 
 
+@celery_app.task(name="tasks.refresh_analytics")
+def refresh_analytics_task() -> str:
+    """Refresh the ``analytics_overview`` snapshot of every tenant.
+
+    The dashboard overview reads these snapshots instead of recomputing the
+    aggregates on each request (see ``analytics_service.get_overview``).
+    """
+    db = SessionLocal()
+    try:
+        tenant_ids = [tid for (tid,) in db.query(Tenant.id).all()]
+        for tenant_id in tenant_ids:
+            refresh_overview_snapshot(db, tenant_id)
+    finally:
+        db.close()
+    return f"Analytics refreshed for {len(tenant_ids)} tenants"
+
+
 # ---------------------------------------------------------------------------
 # Beat schedule
 # ---------------------------------------------------------------------------
@@ -160,6 +180,12 @@ celery_app.conf.beat_schedule = {
         # variables to determine tenants and isolation mode.
         "args": [],
     },
+    "hourly-analytics": {
+        "task": "tasks.refresh_analytics",
+        # Keep the dashboard snapshots within the hour served by get_overview.
+        "schedule": crontab(minute=5),
+        "args": [],
+    },
 }
 
 
@@ -169,4 +195,5 @@ __all__ = [
     "compute_rfm_task",
     "generate_recommendations_task",
     "send_email_task",
+    "refresh_analytics_task",
 ]
\ No newline at end of file
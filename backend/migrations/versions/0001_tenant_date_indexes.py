@@ -0,0 +1,45 @@
+"""Index (tenant, date) sur clients et ventes.
+
+``create_all`` n'ajoute pas d'index aux tables existantes : cette révision
+les crée sur les bases déjà déployées. Elle est idempotente (un index déjà
+présent, par exemple créé par ``create_all`` sur une base neuve, est
+ignoré).
+
+Revision ID: 0001_tenant_date_indexes
+Revises:
+Create Date: 2026-10-16
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0001_tenant_date_indexes"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+_INDEXES = (
+    ("ix_clients_tenant_last_purchase", "clients", ["tenant_id", "last_purchase_date"]),
+    ("ix_sales_tenant_sale_date", "sales", ["tenant_id", "sale_date"]),
+)
+
+
+def _existing_indexes(table: str) -> set:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return set()
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    for name, table, columns in _INDEXES:
+        if name not in _existing_indexes(table):
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(_INDEXES):
+        if name in _existing_indexes(table):
+            op.drop_index(name, table_name=table)
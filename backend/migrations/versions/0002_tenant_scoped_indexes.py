@@ -0,0 +1,60 @@
+"""Index par tenant (doublons de ventes, statuts de contact, recommandations)
+et table ``analytics_overview``.
+
+Comme la révision précédente, chaque opération est ignorée si l'objet
+existe déjà (base créée ou complétée par ``create_all``).
+
+Revision ID: 0002_tenant_scoped_indexes
+Revises: 0001_tenant_date_indexes
+Create Date: 2026-10-16
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0002_tenant_scoped_indexes"
+down_revision = "0001_tenant_date_indexes"
+branch_labels = None
+depends_on = None
+
+_INDEXES = (
+    ("ix_sales_tenant_document_product", "sales", ["tenant_id", "document_id", "product_key"]),
+    ("ix_contact_events_tenant_status", "contact_events", ["tenant_id", "status"]),
+    ("ix_recommendations_tenant", "recommendations", ["tenant_id"]),
+)
+
+
+def _existing_indexes(table: str) -> set:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return set()
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    for name, table, columns in _INDEXES:
+        if name not in _existing_indexes(table):
+            op.create_index(name, table, columns)
+    if not sa.inspect(op.get_bind()).has_table("analytics_overview"):
+        op.create_table(
+            "analytics_overview",
+            sa.Column("tenant_id", sa.Integer(), sa.ForeignKey("tenants.id"), primary_key=True),
+            sa.Column("total_clients", sa.Integer(), nullable=True),
+            sa.Column("active_clients", sa.Integer(), nullable=True),
+            sa.Column("churn_rate", sa.Float(), nullable=True),
+            sa.Column("total_revenue", sa.Float(), nullable=True),
+            sa.Column("average_order_value", sa.Float(), nullable=True),
+            sa.Column("recommendation_count", sa.Integer(), nullable=True),
+            sa.Column("data_version", sa.String(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("analytics_overview"):
+        op.drop_table("analytics_overview")
+    for name, table, _ in reversed(_INDEXES):
+        if name in _existing_indexes(table):
+            op.drop_index(name, table_name=table)
@@ -1,6 +1,7 @@
 import pytest
-from pydantic import ValidationError
+from pydantic import EmailStr, TypeAdapter, ValidationError
 
+from backend.app import schemas
 from backend.app.schemas import ClientRead, ClientCreate, ClientUpdate
 
 def test_clientread_invalid_email_becomes_none():
@@ -49,3 +50,32 @@ def test_clientcreate_rejects_invalid_email_input():
 def test_clientupdate_rejects_invalid_email_when_provided():
     with pytest.raises(ValidationError):
         ClientUpdate.model_validate({"email": "not-an-email"})
+
+def test_clientcreate_strips_valid_email_input():
+    m = ClientCreate.model_validate(
+        {"tenant_id": 123, "client_code": "C005", "email": " test@example.com "}
+    )
+    assert m.email == "test@example.com"
+
+
+def test_normalize_email_fast_path_matches_email_str():
+    adapter = TypeAdapter(EmailStr)
+    samples = [
+        "alice@example.com",
+        "Alice.Smith+crm@Example.COM",
+        "x_y@sub.dom-ain.fr",
+        "a..b@example.com",
+        "a@b.test",
+        "a@-bad.com",
+        "éloïse@exemple.fr",
+        "Info@Example.com",
+        "SALES@shop.fr",
+        "x@EG--r.com",
+        "a@xn--abc.com",
+    ]
+    for raw in samples:
+        try:
+            expected = adapter.validate_python(raw)
+        except ValueError:
+            expected = None
+        assert schemas._normalize_email(raw) == expected
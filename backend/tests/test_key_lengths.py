@@ -0,0 +1,17 @@
+import pytest
+from pydantic import ValidationError
+
+from backend.app.schemas import ClientCreate, ClientRead, ProductCreate, ProductRead
+
+
+def test_key_lengths_bound_inputs_only():
+    long_key = "x" * 300
+    with pytest.raises(ValidationError):
+        ProductCreate.model_validate({"product_key": long_key, "name": "n", "tenant_id": 1})
+    with pytest.raises(ValidationError):
+        ClientCreate.model_validate({"client_code": long_key, "tenant_id": 1})
+    # Valeurs déjà en base (ETL) : relues sans borne
+    product = ProductRead.model_validate({"id": 1, "product_key": long_key, "name": "n", "tenant_id": 1})
+    assert product.product_key == long_key
+    client = ClientRead.model_validate({"id": 1, "client_code": long_key, "tenant_id": 1})
+    assert client.client_code == long_key
@@ -0,0 +1,26 @@
+import ast
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1] / "app"
+
+
+def test_pydantic_is_imported_by_attribute():
+    """Interdit ``import pydantic`` / ``pydantic.X`` dans l'application.
+
+    Le ``__getattr__`` paresseux de pydantic est réévalué à chaque accès
+    ``pydantic.X`` : on importe les noms une fois pour toutes via
+    ``from pydantic import ...``.
+    """
+    offenders = []
+    for path in sorted(APP_DIR.rglob("*.py")):
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import) and any(a.name == "pydantic" for a in node.names):
+                offenders.append(f"{path.name}:{node.lineno}")
+            elif (
+                isinstance(node, ast.Attribute)
+                and isinstance(node.value, ast.Name)
+                and node.value.id == "pydantic"
+            ):
+                offenders.append(f"{path.name}:{node.lineno}")
+    assert offenders == []
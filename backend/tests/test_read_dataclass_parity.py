@@ -0,0 +1,140 @@
+import datetime as dt
+from types import SimpleNamespace
+
+from backend.app import schemas
+
+
+def _client_row(**overrides):
+    row = dict(
+        id=7,
+        tenant_id=1,
+        client_code="C001",
+        name="Alice",
+        email="  alice@example.com ",
+        last_purchase_date=dt.datetime(2024, 5, 17, 10, 30),
+        total_spent=120.5,
+        total_orders=3,
+        average_order_value=40.1,
+        recency=12.0,
+        frequency=3.0,
+        monetary=120.5,
+        rfm_score=11,
+        rfm_segment="Loyal Customers",
+        preferred_families="Rouge,Blanc",
+        budget_band="Medium",
+        aroma_profile=None,
+        cluster="c1",
+        last_contact_date=None,
+        email_opt_out=False,
+    )
+    row.update(overrides)
+    return SimpleNamespace(**row)
+
+
+def test_client_dc_matches_model_dump():
+    for row in (_client_row(), _client_row(email="not-an-email", name=None, email_opt_out=None)):
+        expected = schemas.ClientRead.model_validate(row, from_attributes=True).model_dump(exclude_none=True)
+        got = schemas.dump_clients([row])[0]
+        assert got == expected
+        assert list(got) == list(expected)
+
+
+def test_product_dc_matches_model_dump():
+    row = SimpleNamespace(
+        id=3,
+        tenant_id=1,
+        product_key="P001",
+        name="Pinot Noir",
+        family_crm="Rouge",
+        sub_family=None,
+        cepage="Pinot",
+        sucrosite_niveau="sec",
+        price_ttc=15.0,
+        margin=None,
+        premium_tier=None,
+        price_band="Medium",
+        aroma_fruit=4.0,
+        aroma_floral=None,
+        aroma_spice=2.0,
+        aroma_mineral=None,
+        aroma_acidity=3.0,
+        aroma_body=None,
+        aroma_tannin=1.0,
+        global_popularity_score=0.6,
+        season_tags=None,
+        is_active=True,
+        is_archived=False,
+        description="Un rouge léger",
+    )
+    expected = schemas.ProductRead.model_validate(row, from_attributes=True).model_dump(exclude_none=True)
+    got = schemas.dump_products([row])[0]
+    assert got == expected
+    assert list(got) == list(expected)
+
+
+def test_sale_order_item_and_reco_item_dc_match_model_dump():
+    sale = SimpleNamespace(
+        id=1,
+        tenant_id=1,
+        document_id="INV-1",
+        product_key="P001",
+        client_code="C001",
+        quantity=2.0,
+        amount=None,
+        sale_date=dt.datetime(2024, 1, 2),
+    )
+    item = SimpleNamespace(id=4, order_id=2, product_id=3, tenant_id=1, quantity=1.0, unit_price=None, total_price=9.5)
+    reco = SimpleNamespace(
+        id=5,
+        run_id=1,
+        client_id=7,
+        product_id=3,
+        tenant_id=1,
+        scenario="rebuy",
+        rank=1,
+        score=0.42,
+        explain_short=None,
+        reasons_json='{"source": "rebuy"}',
+    )
+    pairs = [
+        (schemas.SaleRead, schemas.dump_sales, sale),
+        (schemas.OrderItemRead, schemas.dump_order_items, item),
+        (schemas.RecoItemRead, schemas.dump_reco_items, reco),
+    ]
+    for model, dump, row in pairs:
+        expected = model.model_validate(row, from_attributes=True).model_dump(exclude_none=True)
+        got = dump([row])[0]
+        assert got == expected
+        assert list(got) == list(expected)
+
+
+def test_reco_item_rows_match_orm_dump():
+    reco = SimpleNamespace(
+        id=5, run_id=1, client_id=7, product_id=3, tenant_id=1,
+        scenario="rebuy", rank=None, score=0.42, explain_short=None, reasons_json=None,
+    )
+    row = tuple(getattr(reco, name) for name in schemas.RecoItemRow._fields)
+    assert schemas.dump_reco_item_rows([row]) == schemas.dump_reco_items([reco])
+
+
+def test_product_list_rows_match_model_dump():
+    row = SimpleNamespace(
+        id=3,
+        product_key="P001",
+        name="Pinot Noir",
+        family_crm="Rouge",
+        price_ttc=None,
+        price_band="Medium",
+        global_popularity_score=0.6,
+        is_active=True,
+        tenant_id=1,
+    )
+    expected = schemas.ProductListRead.model_validate(row, from_attributes=True).model_dump(exclude_none=True)
+    got = schemas.dump_product_list_rows([tuple(getattr(row, f) for f in schemas.ProductListRow._fields)])[0]
+    assert got == expected
+    assert list(got) == list(expected)
+
+
+def test_read_schemas_accept_orm_attributes():
+    for model in (schemas.ProductRead, schemas.ProductAliasRead, schemas.RecoOutputRead):
+        assert model.model_config["from_attributes"] is True
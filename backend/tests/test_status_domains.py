@@ -0,0 +1,23 @@
+import datetime as dt
+
+import pytest
+from pydantic import ValidationError
+
+from backend.app.schemas import CampaignCreate, CampaignRead, RecoRunCreate, RecoRunRead
+
+
+def test_campaign_create_accepts_null_status_and_rejects_unknown():
+    assert CampaignCreate.model_validate({"name": "c", "status": None, "tenant_id": 1}).status is None
+    assert CampaignCreate.model_validate({"name": "c", "tenant_id": 1}).status == "draft"
+    with pytest.raises(ValidationError):
+        CampaignCreate.model_validate({"name": "c", "status": "archived", "tenant_id": 1})
+    with pytest.raises(ValidationError):
+        RecoRunCreate.model_validate({"status": "archived", "tenant_id": 1})
+
+
+def test_read_schemas_keep_stored_status_values():
+    campaign = CampaignRead.model_validate(
+        {"id": 1, "name": "c", "status": "archived", "tenant_id": 1, "created_at": dt.datetime(2024, 1, 1)}
+    )
+    assert campaign.status == "archived"
+    assert RecoRunRead.model_validate({"id": 1, "status": "queued", "tenant_id": 1}).status == "queued"
@@ -2,7 +2,7 @@
 
 import { ColumnDef } from "@tanstack/react-table";
 import { useQuery } from "@tanstack/react-query";
-import { useMemo } from "react";
+import { useMemo, useState } from "react";
 
 import { DataTable } from "@/components/data-table";
 import { EmptyState } from "@/components/empty-state";
@@ -17,6 +17,13 @@ import {
   CardTitle,
 } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
+import {
+  Dialog,
+  DialogContent,
+  DialogDescription,
+  DialogHeader,
+  DialogTitle,
+} from "@/components/ui/dialog";
 import { Skeleton } from "@/components/ui/skeleton";
 import { ApiError, apiRequest } from "@/lib/api";
 import { endpoints } from "@/lib/endpoints";
@@ -24,6 +31,15 @@ import { humanizeKey } from "@/lib/format";
 
 type AuditRow = Record<string, unknown>;
 
+type AuditLogDetail = {
+  id: number;
+  executed_at: string;
+  errors: number;
+  warnings: number;
+  score: number;
+  details?: string | null;
+};
+
 type AuditPayload = {
   rows: AuditRow[];
   headers: string[];
@@ -63,6 +79,13 @@ function buildHeaders(rows: AuditRow[]): string[] {
   return headers;
 }
 
+function getLogId(row: AuditRow | null): string | null {
+  if (!row || row.id === null || row.id === undefined || row.id === "") {
+    return null;
+  }
+  return String(row.id);
+}
+
 function formatCellValue(value: unknown) {
   if (value === null || value === undefined || value === "") return "-";
   if (typeof value === "string") return value;
@@ -160,20 +183,56 @@ async function fetchAuditData(): Promise<AuditPayload> {
 }
 
 export default function AuditPage() {
+  const [selectedLog, setSelectedLog] = useState<AuditRow | null>(null);
+
   const query = useQuery({
     queryKey: ["audit", "logs"],
     queryFn: fetchAuditData,
   });
 
-  const columns = useMemo<ColumnDef<AuditRow>[]>(
-    () =>
-      (query.data?.headers ?? []).map((header) => ({
+  // La liste /audit/logs ne renvoie pas les details : ils sont lus a
+  // l'ouverture d'une ligne via /audit/logs/{id}.
+  const selectedId = getLogId(selectedLog);
+  const detailQuery = useQuery({
+    queryKey: ["audit", "logs", selectedId],
+    queryFn: () =>
+      apiRequest<AuditLogDetail>(endpoints.audit.logDetail(selectedId as string)),
+    enabled: Boolean(selectedId),
+  });
+
+  const columns = useMemo<ColumnDef<AuditRow>[]>(() => {
+    const dataColumns: ColumnDef<AuditRow>[] = (query.data?.headers ?? []).map(
+      (header) => ({
         accessorKey: header,
         header: humanizeKey(header),
         cell: ({ row }) => formatCellValue(row.original[header]),
-      })),
-    [query.data?.headers]
-  );
+      })
+    );
+    if (query.data?.source !== "json" || !dataColumns.length) {
+      return dataColumns;
+    }
+    return [
+      ...dataColumns,
+      {
+        id: "actions",
+        header: "Actions",
+        cell: ({ row }) => (
+          <Button
+            size="sm"
+            variant="outline"
+            onClick={() => setSelectedLog(row.original)}
+            disabled={!getLogId(row.original)}
+          >
+            Voir details
+          </Button>
+        ),
+      },
+    ];
+  }, [query.data?.headers, query.data?.source]);
+
+  const detailLines = detailQuery.data?.details
+    ? detailQuery.data.details.split("\n").filter((line) => line.trim() !== "")
+    : [];
 
   const hasData = (query.data?.rows ?? []).length > 0;
   const hasColumns = columns.length > 0;
@@ -241,6 +300,37 @@ export default function AuditPage() {
           )}
         </CardContent>
       </Card>
+      <Dialog
+        open={Boolean(selectedLog)}
+        onOpenChange={(open) => {
+          if (!open) setSelectedLog(null);
+        }}
+      >
+        <DialogContent className="max-w-3xl">
+          <DialogHeader>
+            <DialogTitle>Details de l'audit</DialogTitle>
+            <DialogDescription>
+              Messages des regles declenchees pour cette execution.
+            </DialogDescription>
+          </DialogHeader>
+          {detailQuery.isLoading ? (
+            <div className="space-y-2">
+              <Skeleton className="h-6 w-40" />
+              <Skeleton className="h-40 w-full" />
+            </div>
+          ) : detailQuery.error ? (
+            <ErrorState message="Details de l'audit indisponibles." />
+          ) : detailLines.length ? (
+            <ul className="max-h-[60vh] space-y-1 overflow-auto rounded-lg bg-muted p-4 text-xs text-foreground">
+              {detailLines.map((line, index) => (
+                <li key={`${selectedId}-${index}`}>{line}</li>
+              ))}
+            </ul>
+          ) : (
+            <EmptyState title="Aucun message pour cet audit." />
+          )}
+        </DialogContent>
+      </Dialog>
     </div>
   );
 }
@@ -17,6 +17,7 @@ import {
   DialogHeader,
   DialogTitle,
 } from "@/components/ui/dialog";
+import { Skeleton } from "@/components/ui/skeleton";
 import { apiRequest } from "@/lib/api";
 import { endpoints } from "@/lib/endpoints";
 import { formatNumber } from "@/lib/format";
@@ -62,6 +63,19 @@ export default function ProductsPage() {
 
   const products = useMemo<ProductRow[]>(() => query.data ?? [], [query.data]);
 
+  // La liste est une projection allegee (sans description ni axes
+  // aromatiques) : la fiche complete est lue a l'ouverture du dialogue.
+  const selectedKey =
+    selectedProduct && typeof selectedProduct.product_key === "string"
+      ? selectedProduct.product_key
+      : null;
+  const detailQuery = useQuery({
+    queryKey: ["products", "detail", selectedKey],
+    queryFn: () =>
+      apiRequest<ProductRow>(endpoints.products.detail(selectedKey as string)),
+    enabled: dialogOpen && Boolean(selectedKey),
+  });
+
   const columnKeys = useMemo(() => {
     const keys = new Set<string>();
 
@@ -155,8 +169,16 @@ export default function ProductsPage() {
               Donnees brutes du produit selectionne.
             </DialogDescription>
           </DialogHeader>
+          {detailQuery.isLoading ? (
+            <div className="space-y-2">
+              <Skeleton className="h-6 w-40" />
+              <Skeleton className="h-40 w-full" />
+            </div>
+          ) : detailQuery.error ? (
+            <ErrorState message="Details du produit indisponibles." />
+          ) : null}
           <pre className="max-h-[60vh] overflow-auto rounded-lg bg-muted p-4 text-xs text-foreground">
-            {selectedProduct ? JSON.stringify(selectedProduct, null, 2) : "{}"}
+            {JSON.stringify(detailQuery.data ?? selectedProduct ?? {}, null, 2)}
           </pre>
         </DialogContent>
       </Dialog>
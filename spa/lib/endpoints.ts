@@ -12,7 +12,8 @@ export const endpoints = {
   },
   products: {
     list: "/products/",
-    detail: (productKey: string) => `/products/${productKey}`,
+    detail: (productKey: string) =>
+      `/products/${encodeURIComponent(productKey)}`,
   },
   recommendations: {
     list: "/recommendations/",
@@ -35,6 +36,7 @@ export const endpoints = {
   audit: {
     latest: "/audit/latest",
     logs: "/audit/logs",
+    logDetail: (logId: string | number) => `/audit/logs/${logId}`,
     run: "/audit/run",
   },
   clusters: {
@@ -2,3 +2,5 @@ import os
 
 # Utiliser SQLite par défaut pour les tests afin d'éviter toute dépendance Postgres.
 os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+# Coût bcrypt minimal : les hachages de test n'ont pas besoin d'être robustes.
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
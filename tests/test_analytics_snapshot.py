@@ -0,0 +1,74 @@
+import importlib
+import os
+from datetime import datetime, timedelta
+
+
+def _setup(db_url: str):
+    os.environ["DATABASE_URL"] = db_url
+    import backend.app.database as db_module
+    import backend.app.models as models
+    import backend.app.services.analytics_service as analytics_service
+    import backend.app.tasks as tasks
+
+    importlib.reload(db_module)
+    importlib.reload(models)
+    importlib.reload(analytics_service)
+    importlib.reload(tasks)
+    db_module.Base.metadata.drop_all(bind=db_module.engine)
+    db_module.Base.metadata.create_all(bind=db_module.engine)
+    return db_module, models, analytics_service, tasks
+
+
+def test_overview_snapshot_served_until_data_version_changes(tmp_path):
+    db_module, models, analytics_service, tasks = _setup(f"sqlite:///{tmp_path/'snapshot.db'}")
+    db = db_module.SessionLocal()
+    tenant = models.Tenant(name="SnapCo", domain=None)
+    db.add(tenant)
+    db.commit()
+    recent = datetime.utcnow() - timedelta(days=10)
+    db.add(models.Client(client_code="S1", last_purchase_date=recent, tenant_id=tenant.id))
+    db.add(
+        models.Sale(
+            document_id="D1", product_key="P1", client_code="S1",
+            quantity=1, amount=40.0, sale_date=recent, tenant_id=tenant.id,
+        )
+    )
+    db.commit()
+
+    assert tasks.refresh_analytics_task() == "Analytics refreshed for 1 tenants"
+    snapshot = db.get(models.AnalyticsOverview, tenant.id)
+    assert (snapshot.total_clients, snapshot.total_revenue) == (1, 40.0)
+
+    # Instantané récent et même version des données : servi tel quel
+    snapshot.total_revenue = 999.0
+    db.commit()
+    analytics_service.invalidate_cache(tenant.id)
+    assert analytics_service.get_overview(db, tenant.id)["total_revenue"] == 999.0
+
+    # Nouvelle vente : la version change, les indicateurs sont recalculés
+    db.add(
+        models.Sale(
+            document_id="D2", product_key="P1", client_code="S1",
+            quantity=1, amount=10.0, sale_date=recent, tenant_id=tenant.id,
+        )
+    )
+    db.commit()
+    overview = analytics_service.get_overview(db, tenant.id)
+    assert overview["total_revenue"] == 50.0
+    assert overview["total_clients"] == 1
+
+    # Instantané trop ancien : ignoré même si la version est à jour
+    analytics_service.refresh_overview_snapshot(db, tenant.id)
+    snapshot = db.get(models.AnalyticsOverview, tenant.id)
+    snapshot.total_revenue = 999.0
+    snapshot.updated_at = datetime.utcnow() - analytics_service._SNAPSHOT_MAX_AGE - timedelta(minutes=1)
+    db.commit()
+    analytics_service.invalidate_cache(tenant.id)
+    assert analytics_service.get_overview(db, tenant.id)["total_revenue"] == 50.0
+
+    # L'invalidation avec session supprime l'instantané dans la transaction
+    # de l'appelant
+    analytics_service.invalidate_cache(tenant.id, db)
+    db.commit()
+    assert db.get(models.AnalyticsOverview, tenant.id) is None
+    db.close()
@@ -0,0 +1,106 @@
+import importlib
+import json
+import os
+
+
+def _setup(db_url: str):
+    os.environ["DATABASE_URL"] = db_url
+    import backend.app.database as db_module
+    import backend.app.models as models
+    import backend.app.services.aroma_service as aroma_service
+
+    importlib.reload(db_module)
+    importlib.reload(models)
+    importlib.reload(aroma_service)
+    db_module.Base.metadata.drop_all(bind=db_module.engine)
+    db_module.Base.metadata.create_all(bind=db_module.engine)
+    return db_module, models, aroma_service
+
+
+def _seed(db, models):
+    tenant = models.Tenant(name="AromaCo", domain=None)
+    other = models.Tenant(name="OtherCo", domain=None)
+    db.add_all([tenant, other])
+    db.commit()
+    # Axes : fruit, floral, spice, mineral, acidity, body, tannin (0..5)
+    fruity = models.Product(
+        product_key="P1", name="Fruité", tenant_id=tenant.id,
+        aroma_fruit=5, aroma_floral=3, aroma_spice=1, aroma_mineral=2,
+        aroma_acidity=4, aroma_body=2, aroma_tannin=1,
+    )
+    # Axes manquants : comptent pour 0
+    structured = models.Product(
+        product_key="P2", name="Charpenté", tenant_id=tenant.id,
+        aroma_fruit=2, aroma_spice=4, aroma_body=5, aroma_tannin=4,
+    )
+    db.add_all([fruity, structured])
+    clients = [
+        models.Client(client_code=code, name=code, tenant_id=tenant_id)
+        for code, tenant_id in (("K1", tenant.id), ("K2", tenant.id), ("K3", tenant.id), ("K1", other.id))
+    ]
+    db.add_all(clients)
+    db.commit()
+    k1, k2, k3, foreign = clients
+    # K1 : 12 commandes de P1 et P2 ; K2 : une commande de P2 ; K3 : aucune
+    orders = []
+    for index in range(12):
+        order = models.Order(client_id=k1.id, tenant_id=tenant.id)
+        order.items = [
+            models.OrderItem(product_id=fruity.id, total_price=30.0, tenant_id=tenant.id),
+            models.OrderItem(product_id=structured.id, total_price=10.0 + index, tenant_id=tenant.id),
+        ]
+        orders.append(order)
+    order = models.Order(client_id=k2.id, tenant_id=tenant.id)
+    order.items = [models.OrderItem(product_id=structured.id, total_price=25.0, tenant_id=tenant.id)]
+    orders.append(order)
+    order = models.Order(client_id=foreign.id, tenant_id=other.id)
+    order.items = [models.OrderItem(product_id=fruity.id, total_price=5.0, tenant_id=other.id)]
+    orders.append(order)
+    db.add_all(orders)
+    db.commit()
+    return tenant, clients
+
+
+EXPECTED_PROFILES = {
+    "K1": {
+        "axes": {
+            "fruit": 0.796, "floral": 0.396, "spice": 0.404, "mineral": 0.264,
+            "acidity": 0.527, "body": 0.604, "tannin": 0.404,
+        },
+        "top_axes": [["fruit", 0.796], ["body", 0.604], ["acidity", 0.527]],
+        "confidence": 0.892,
+        "level": "High",
+    },
+    "K2": {
+        "axes": {
+            "fruit": 0.4, "floral": 0.0, "spice": 0.8, "mineral": 0.0,
+            "acidity": 0.0, "body": 1.0, "tannin": 0.8,
+        },
+        "top_axes": [["body", 1.0], ["spice", 0.8], ["tannin", 0.8]],
+        "confidence": 0.25,
+        "level": "Low",
+    },
+    "K3": {"axes": {}, "top_axes": [], "confidence": 0.0, "level": "Low"},
+}
+
+
+def test_aroma_profiles_pin_stored_json(tmp_path):
+    db_module, models, aroma_service = _setup(f"sqlite:///{tmp_path/'aroma.db'}")
+    db = db_module.SessionLocal()
+    tenant, clients = _seed(db, models)
+    service = aroma_service.AromaService(db)
+
+    assert service.compute_client_aroma_profiles(tenant.id) == 3
+
+    db.expire_all()
+    stored = {
+        c.client_code: json.loads(c.aroma_profile) if c.aroma_profile else None
+        for c in db.query(models.Client).filter_by(tenant_id=tenant.id)
+    }
+    assert stored == EXPECTED_PROFILES
+    # Le calcul unitaire donne le même profil que le calcul par lot
+    single = service.compute_for_client(clients[0].id)
+    assert json.loads(json.dumps(single.__dict__)) == EXPECTED_PROFILES["K1"]
+    # Client de l'autre tenant : non touché
+    assert db.get(models.Client, clients[3].id).aroma_profile is None
+    db.close()
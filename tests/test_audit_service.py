@@ -0,0 +1,122 @@
+import importlib
+import os
+from datetime import datetime, timedelta
+
+
+def _setup(db_url: str):
+    os.environ["DATABASE_URL"] = db_url
+    import backend.app.database as db_module
+    import backend.app.models as models
+    import backend.app.services.audit_service as audit_service
+
+    importlib.reload(db_module)
+    importlib.reload(models)
+    importlib.reload(audit_service)
+    db_module.Base.metadata.drop_all(bind=db_module.engine)
+    db_module.Base.metadata.create_all(bind=db_module.engine)
+    return db_module, models, audit_service
+
+
+def _seed(db, models):
+    tenant = models.Tenant(name="AuditCo", domain=None)
+    other = models.Tenant(name="OtherCo", domain=None)
+    db.add_all([tenant, other])
+    db.commit()
+    now = datetime.utcnow()
+    db.add_all(
+        [
+            models.Client(
+                client_code="A1", email="élodie@test.com", last_purchase_date=now - timedelta(days=10),
+                recency=10, frequency=3, monetary=120.0, tenant_id=tenant.id,
+            ),
+            models.Client(client_code="A2", email=None, tenant_id=tenant.id),
+            models.Client(
+                client_code="A3", email="dup@test.com", last_purchase_date=now - timedelta(days=200),
+                recency=200, frequency=1, monetary=20.0, tenant_id=tenant.id,
+            ),
+            models.Client(
+                client_code="A4", email="DUP@test.com", last_purchase_date=now - timedelta(days=400),
+                recency=400, frequency=1, monetary=30.0, tenant_id=tenant.id,
+            ),
+            models.Client(
+                client_code="A5", email="ÉLODIE@test.com", last_purchase_date=now - timedelta(days=20),
+                recency=20, frequency=1, monetary=12.0, tenant_id=tenant.id,
+            ),
+            # Autre tenant : jamais pris en compte
+            models.Client(client_code="A1", email="dup@test.com", tenant_id=other.id),
+        ]
+    )
+    db.add_all(
+        [
+            models.Product(product_key="P1", name="Rouge", family_crm="Rouge", price_ttc=12, margin=3, tenant_id=tenant.id),
+            models.Product(product_key="P2", name="Cher", family_crm="", price_ttc=1500, margin=-2, tenant_id=tenant.id),
+            models.Product(product_key="P3", name="Blanc", family_crm="Blanc", price_ttc=15, margin=4, tenant_id=other.id),
+        ]
+    )
+    recent = now - timedelta(days=5)
+    old = now - timedelta(days=60)
+    sales = [
+        # (document, produit, client, quantité, montant, date)
+        ("D1", "P1", "A1", 1, 12.0, recent),
+        ("D1", "P1", "A1", 1, 12.0, recent),
+        ("D2", "P2", "A1", 1, 1500.0, old),
+        ("D3", "P1", "A3", -1, 12.0, old),
+        ("D4", "PX", "A3", 1, 10.0, old),
+        ("D5", "P1", "ZZ", 1, 12.0, old),
+        ("D6", "P1", "A4", 0, 0.0, old),
+        # Produit d'un autre tenant : inconnu pour ce tenant
+        ("D7", "P3", "A4", 1, 15.0, old),
+        ("D8", "P1", "A5", 1, 12.0, old),
+    ]
+    db.add_all(
+        [
+            models.Sale(
+                document_id=document_id, product_key=product_key, client_code=code,
+                quantity=quantity, amount=amount, sale_date=sale_date, tenant_id=tenant.id,
+            )
+            for document_id, product_key, code, quantity, amount, sale_date in sales
+        ]
+    )
+    db.commit()
+    return tenant
+
+
+# A4 (plus de 365 jours) ne reçoit pas de CHURN_WARNING en plus du SILENCE_WINDOW ;
+# les e‑mails accentués sont comparés sans casse quel que soit le moteur
+EXPECTED_DETAILS = [
+    "NO_PURCHASE_DATA: Client A2 n'a aucune date d'achat",
+    "MISSING_EMAIL: Client A2 sans e‑mail",
+    "INCOMPLETE_RFM: Client A2 a des composantes RFM manquantes",
+    "CHURN_WARNING: Client A3 n'a pas acheté depuis plus de 180 jours",
+    "SILENCE_WINDOW: Client A4 inactif depuis plus de 365 jours",
+    "DUPLICATE_EMAIL: L'e‑mail élodie@test.com est utilisé par plusieurs clients (A1, A5)",
+    "DUPLICATE_EMAIL: L'e‑mail dup@test.com est utilisé par plusieurs clients (A3, A4)",
+    "RECENT_DUPLICATE: D1 P1 apparaît 2 fois en 30 jours",
+    "LOW_DIVERSITY: Client A5 n'a acheté qu'un seul produit",
+    "INVALID_SALE_VALUE: Vente D3 P1 a une quantité ou un montant invalide",
+    "UNKNOWN_PRODUCT: Vente D4 référence un produit inconnu (PX)",
+    "UNKNOWN_CLIENT: Vente D5 référence un client inconnu (ZZ)",
+    "INVALID_SALE_VALUE: Vente D6 P1 a une quantité ou un montant invalide",
+    "ZERO_QUANTITY: Vente D6 P1 a une quantité nulle",
+    "UNKNOWN_PRODUCT: Vente D7 référence un produit inconnu (P3)",
+    "UNREALISTIC_PRICE: Produit P2 a un prix inhabituel (1500.0)",
+    "NEGATIVE_MARGIN: Produit P2 a une marge négative (-2.0)",
+    "MISSING_FAMILY: Produit P2 n'a pas de famille CRM définie",
+]
+# (erreurs, warnings, score)
+EXPECTED_COUNTS = (11, 7, -410.0)
+
+
+def test_run_audit_pins_counts_and_messages(tmp_path):
+    db_module, models, audit_service = _setup(f"sqlite:///{tmp_path/'audit.db'}")
+    db = db_module.SessionLocal()
+    tenant = _seed(db, models)
+
+    log = audit_service.run_audit(db, tenant.id)
+
+    assert log.details.split("\n") == EXPECTED_DETAILS
+    assert (log.errors, log.warnings, log.score) == EXPECTED_COUNTS
+    stored = db.query(models.AuditLog).filter_by(tenant_id=tenant.id).one()
+    assert (stored.errors, stored.warnings, stored.score) == EXPECTED_COUNTS
+    db.close()
+
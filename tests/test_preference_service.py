@@ -0,0 +1,130 @@
+import importlib
+import os
+from datetime import datetime
+
+
+def _setup(db_url: str):
+    os.environ["DATABASE_URL"] = db_url
+    import backend.app.database as db_module
+    import backend.app.models as models
+    import backend.app.services.preference_service as preference_service
+
+    importlib.reload(db_module)
+    importlib.reload(models)
+    importlib.reload(preference_service)
+    db_module.Base.metadata.drop_all(bind=db_module.engine)
+    db_module.Base.metadata.create_all(bind=db_module.engine)
+    return db_module, models, preference_service
+
+
+def _seed(db, models):
+    tenant = models.Tenant(name="PrefCo", domain=None)
+    other = models.Tenant(name="OtherCo", domain=None)
+    db.add_all([tenant, other])
+    db.commit()
+    db.add_all(
+        [
+            models.Product(product_key="R1", name="Rouge 1", family_crm="Rouge", tenant_id=tenant.id),
+            models.Product(product_key="R2", name="Rouge 2", family_crm="Rouge", tenant_id=tenant.id),
+            models.Product(product_key="B1", name="Blanc", family_crm="Blanc", tenant_id=tenant.id),
+            models.Product(product_key="E1", name="Effervescent", family_crm="Bulles", tenant_id=tenant.id),
+            models.Product(product_key="N1", name="Sans famille", family_crm="", tenant_id=tenant.id),
+            models.Product(product_key="Z1", name="Jamais vendu", family_crm="Rosé", tenant_id=tenant.id),
+            # Autre tenant : ni ses produits ni ses ventes ne sont pris en compte
+            models.Product(product_key="O1", name="Rouge ailleurs", family_crm="Rouge", tenant_id=other.id),
+        ]
+    )
+    # Paniers moyens : répartis en bandes Low / Medium / High (0 ou absent : aucune)
+    aovs = {"C1": 10.0, "C2": 20.0, "C3": 30.0, "C4": 40.0, "C5": 0.0, "C6": None}
+    db.add_all(
+        [
+            models.Client(client_code=code, name=code, average_order_value=aov, tenant_id=tenant.id)
+            for code, aov in aovs.items()
+        ]
+    )
+    sales = [
+        # C1 : Rouge x3, Blanc x1
+        ("C1", "R1"), ("C1", "R2"), ("C1", "B1"), ("C1", "R1"),
+        # C2 : Blanc, Bulles et Rouge à égalité : les deux premières achetées
+        ("C2", "B1"), ("C2", "E1"), ("C2", "R1"),
+        # C3 : produit inconnu et produit sans famille -> "unknown"
+        ("C3", "XX"), ("C3", "N1"), ("C3", "E1"),
+        # C4 : une seule famille
+        ("C4", "E1"),
+        # Code sans client
+        ("C9", "R1"),
+    ]
+    day = datetime(2025, 1, 15)
+    db.add_all(
+        [
+            models.Sale(
+                document_id=f"D{index}", product_key=key, client_code=code,
+                quantity=1, amount=10.0, sale_date=day, tenant_id=tenant.id,
+            )
+            for index, (code, key) in enumerate(sales)
+        ]
+    )
+    db.add(
+        models.Sale(
+            document_id="O1", product_key="O1", client_code="C1",
+            quantity=1, amount=10.0, sale_date=day, tenant_id=other.id,
+        )
+    )
+    db.commit()
+    return tenant, other
+
+
+# (client_code, preferred_families, budget_band), par identifiant client
+EXPECTED_PREFERENCES = [
+    ("C1", "Rouge,Blanc", "Low"),
+    ("C2", "Blanc,Bulles", "Medium"),
+    ("C3", "unknown,Bulles", "High"),
+    ("C4", "Bulles", "High"),
+    ("C5", None, None),
+    ("C6", None, None),
+]
+
+
+def test_client_preferences_pin_families_and_budget(tmp_path):
+    db_module, models, preference_service = _setup(f"sqlite:///{tmp_path/'pref.db'}")
+    db = db_module.SessionLocal()
+    tenant, _ = _seed(db, models)
+
+    preference_service.compute_client_preferences(db, tenant.id)
+
+    db.expire_all()
+    got = [
+        (c.client_code, c.preferred_families, c.budget_band)
+        for c in db.query(models.Client).filter_by(tenant_id=tenant.id).order_by(models.Client.id)
+    ]
+    assert got == EXPECTED_PREFERENCES
+    db.close()
+
+
+# Nombre de ventes du produit / nombre total de ventes du tenant (12)
+EXPECTED_POPULARITY = {
+    "R1": 4 / 12,
+    "R2": 1 / 12,
+    "B1": 2 / 12,
+    "E1": 3 / 12,
+    "N1": 1 / 12,
+    "Z1": 0.0,
+}
+
+
+def test_products_popularity_pins_scores(tmp_path):
+    db_module, models, preference_service = _setup(f"sqlite:///{tmp_path/'popularity.db'}")
+    db = db_module.SessionLocal()
+    tenant, other = _seed(db, models)
+
+    preference_service.compute_products_popularity(db, tenant.id)
+
+    db.expire_all()
+    got = {
+        p.product_key: p.global_popularity_score
+        for p in db.query(models.Product).filter_by(tenant_id=tenant.id)
+    }
+    assert got == EXPECTED_POPULARITY
+    # Produits de l'autre tenant : score inchangé
+    assert db.query(models.Product).filter_by(tenant_id=other.id).one().global_popularity_score == 0.0
+    db.close()
@@ -0,0 +1,111 @@
+import importlib
+import os
+from datetime import datetime, timedelta
+
+
+def _setup(db_url: str):
+    os.environ["DATABASE_URL"] = db_url
+    import backend.app.database as db_module
+    import backend.app.models as models
+    import backend.app.services.analytics_service as analytics_service
+    import backend.app.services.rfm_service as rfm_service
+
+    importlib.reload(db_module)
+    importlib.reload(models)
+    importlib.reload(analytics_service)
+    importlib.reload(rfm_service)
+    db_module.Base.metadata.drop_all(bind=db_module.engine)
+    db_module.Base.metadata.create_all(bind=db_module.engine)
+    return db_module, models, rfm_service
+
+
+def _seed(db, models):
+    tenant = models.Tenant(name="RfmCo", domain=None)
+    db.add(tenant)
+    db.commit()
+    ref = datetime(2025, 3, 1, 12, 0)
+    codes = ["C1", "C2", "C3", "C4", "C5", "C6", "C7"]
+    db.add_all([models.Client(client_code=code, name=code, tenant_id=tenant.id) for code in codes])
+    # Doublon de code : seul le premier client (par identifiant) est mis à jour
+    db.add(models.Client(client_code="C1", name="C1 bis", tenant_id=tenant.id))
+    sales = [
+        # (document, client, quantité, montant, jours avant la référence)
+        ("D1", "C1", 1, 120.0, 0),
+        ("D2", "C1", 2, 80.0, 3),
+        ("D3", "C1", 1, 95.0, 10),
+        ("D4", "C1", 1, 60.0, 20),
+        ("D5", "C2", 1, 40.0, 5),
+        ("D6", "C2", 1, 35.0, 40),
+        ("D7", "C2", 1, 30.0, 70),
+        ("D8", "C3", 1, 15.0, 400),
+        ("D9", "C4", 3, 250.0, 2),
+        # Montant absent : la quantité sert de montant
+        ("D10", "C5", 3, None, 30),
+        ("D11", "C5", 1, 12.5, 90),
+        # Document vide : vente comptée dans le montant, pas comme commande
+        ("", "C5", 1, 7.5, 15),
+        ("D12", "C6", 1, 22.0, 200),
+        ("D13", "C6", 1, 18.0, 250),
+        # Ligne de commande supplémentaire sur un document déjà vu
+        ("D1", "C1", 1, 5.0, 0),
+        # Code sans client : ignoré à l'écriture
+        ("D14", "X9", 1, 10.0, 1),
+    ]
+    db.add_all(
+        [
+            models.Sale(
+                document_id=document_id,
+                product_key="P1",
+                client_code=code,
+                quantity=quantity,
+                amount=amount,
+                sale_date=ref - timedelta(days=days),
+                tenant_id=tenant.id,
+            )
+            for document_id, code, quantity, amount, days in sales
+        ]
+    )
+    db.commit()
+    return tenant
+
+
+# Valeurs attendues (client_code, total_orders, total_spent, average_order_value,
+# recency, frequency, monetary, rfm_score, rfm_segment), par identifiant client
+EXPECTED = [
+    ("C1", 4, 360.0, 90.0, 0.0, 4.0, 360.0, 15, "Champions"),
+    ("C2", 3, 105.0, 35.0, 5.0, 3.0, 105.0, 12, "Loyal Customers"),
+    ("C3", 1, 15.0, 15.0, 400.0, 1.0, 15.0, 3, "At Risk"),
+    ("C4", 1, 250.0, 250.0, 2.0, 1.0, 250.0, 10, "Recent Customers"),
+    ("C5", 2, 23.0, 11.5, 15.0, 2.0, 23.0, 7, "Others"),
+    ("C6", 2, 40.0, 20.0, 200.0, 2.0, 40.0, 7, "Others"),
+    # Sans vente, ou doublon de code : valeurs par défaut du modèle
+    ("C7", 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0, None),
+    ("C1", 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0, None),
+]
+
+
+def test_compute_rfm_pins_scores_and_segments(tmp_path):
+    db_module, models, rfm_service = _setup(f"sqlite:///{tmp_path/'rfm.db'}")
+    db = db_module.SessionLocal()
+    tenant = _seed(db, models)
+
+    rfm_service.compute_rfm_for_tenant(db, tenant.id)
+
+    db.expire_all()
+    clients = db.query(models.Client).order_by(models.Client.id).all()
+    got = [
+        (
+            c.client_code,
+            c.total_orders,
+            c.total_spent,
+            c.average_order_value,
+            c.recency,
+            c.frequency,
+            c.monetary,
+            c.rfm_score,
+            c.rfm_segment,
+        )
+        for c in clients
+    ]
+    assert got == EXPECTED
+    db.close()